@@ -1,10 +1,15 @@
 from .chars import *
-from .terminal import cprint, global_state, complete
+from .mode import color_mode, set_color_mode, get_color_mode, color_enabled
+from .terminal import cprint, acprint, global_state, stream_state, StreamState, complete, FrameWriter
+from .live import LiveLine, LiveDisplay
+from .progress import ProgressBar
+from .screen import Screen
 from .fancy import t, text
 from .sub import sub, subprint, full_demo
 from .cases import cases
 from .art import big_text, box, big
 from .emojis import emojis, emoji_names, dashed_emoji_names
 from .unicode import unicode_names, dashed_unicode_names, unicode
-from .strip import strip_text, stripped_length
+from .strip import strip_text, strip_stream, stripped_length
 from .sim import sim
+from .ansi import ansi_slice, ansi_truncate, ansi_wrap, visible_width, ColumnIndex
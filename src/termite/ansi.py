@@ -0,0 +1,480 @@
+"""
+Shared ANSI escape sequence tokenizer.
+
+`tokenize` splits a string into typed tokens, given as (kind, start, end) offsets into
+the original string, so consumers only copy the pieces they actually need.
+`strip`, `sim` and friends all parse escapes through here.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterator
+
+RESET = "\x1b[0m"
+
+TEXT = "text"        # run of printable characters
+CSI = "csi"          # ESC [ params final          (colors, cursor movement, clears)
+OSC = "osc"          # ESC ] ... BEL / ESC \       (titles, hyperlinks), also DCS/APC/PM/SOS strings
+ESC = "esc"          # ESC intermediates final     (ESC 7 / ESC 8, charsets like ESC ( B)
+CTRL = "ctrl"        # a single C0 control char    (\n, \r, \b, \t, a lone ESC, ...)
+PARTIAL = "partial"  # escape sequence cut off by the end of the input
+
+_KINDS = (None, CSI, OSC, PARTIAL, ESC, CTRL)
+
+_TOKEN_RE = re.compile(
+    r"(\x1b\[[0-?]*[ -/]*[@-~])"                                         # CSI
+    r"|(\x1b[\]P^_X][^\x07\x1b]*(?:\x07|\x1b\\))"                        # OSC & other strings
+    r"|(\x1b(?:\[[0-?]*[ -/]*|[\]P^_X][^\x07\x1b]*\x1b?|[ -/]*)\Z)"     # cut off at the end
+    r"|(\x1b[ -/]*[0-~])"                                                # two-char escapes
+    r"|([\x00-\x1f\x7f])"                                                # control chars
+)
+
+# CSI commands that move the cursor
+CURSOR_CMDS = {
+    "A",  # CUU - cursor up
+    "B",  # CUD - cursor down
+    "C",  # CUF - cursor forward (right)
+    "D",  # CUB - cursor backward (left)
+    "E",  # CNL - cursor next line
+    "F",  # CPL - cursor previous line
+    "G",  # CHA - cursor horizontal absolute
+    "H",  # CUP - cursor position
+    "f",  # HVP - horizontal & vertical position (alias)
+    "S",  # SU - scroll up
+    "T",  # SD - scroll down
+}
+
+# SGR parameter sets
+FG_CODES = {
+    30, 31, 32, 33, 34, 35, 36, 37, 39,
+    90, 91, 92, 93, 94, 95, 96, 97,
+}
+BG_CODES = {
+    40, 41, 42, 43, 44, 45, 46, 47, 49,
+    100, 101, 102, 103, 104, 105, 106, 107,
+}
+STYLE_CODES = {
+    1, 2, 3, 4, 5, 7, 8, 9,
+    21, 22, 23, 24, 25, 27, 28, 29,
+    51, 52, 53, 54, 55,
+}
+# Extended color SGR introducers: 38 (fg), 48 (bg), 58 (underline color)
+EXT_COLOR_CODES = {38, 48, 58}
+
+
+def tokenize(s: str, pos: int = 0, endpos: int | None = None) -> Iterator[tuple[str, int, int]]:
+    """
+    Yield (kind, start, end) tokens covering s[pos:endpos].
+    `kind` is one of TEXT, CSI, OSC, ESC, CTRL or PARTIAL.
+    """
+    if endpos is None:
+        endpos = len(s)
+    for m in _TOKEN_RE.finditer(s, pos, endpos):
+        start = m.start()
+        if start > pos:
+            yield TEXT, pos, start
+        pos = m.end()
+        yield _KINDS[m.lastindex], start, pos
+    if pos < endpos:
+        yield TEXT, pos, endpos
+
+
+def csi_parts(s: str, start: int, end: int) -> tuple[str, str]:
+    """Split the CSI token s[start:end] into its (params, command)."""
+    return s[start + 2:end - 1], s[end - 1]
+
+
+def csi_nums(params_str: str) -> list[int]:
+    """Numeric CSI parameters; missing ones are 0, and no params at all means [1]."""
+    if not params_str:
+        return [1]
+    nums = []
+    for p in params_str.split(";"):
+        if p == "":
+            nums.append(0)
+        else:
+            try:
+                nums.append(int(p))
+            except ValueError:
+                nums.append(0)
+    return nums
+
+
+# Which "slot" of the style each SGR code sets; a later code in the same slot replaces it
+_SGR_SLOTS = {
+    1: "bold", 2: "dim", 3: "italic", 4: "underline", 21: "underline", 5: "blink", 6: "blink",
+    7: "reverse", 8: "hidden", 9: "strike", 51: "frame", 52: "frame", 53: "overline",
+    38: "fg", 48: "bg", 58: "ulcolor",
+    **{c: "fg" for c in FG_CODES if c != 39},
+    **{c: "bg" for c in BG_CODES if c != 49},
+}
+# Which slots each SGR "off" code clears
+_SGR_OFF = {
+    22: ("bold", "dim"), 23: ("italic",), 24: ("underline",), 25: ("blink",), 27: ("reverse",),
+    28: ("hidden",), 29: ("strike",), 39: ("fg",), 49: ("bg",), 54: ("frame",), 55: ("overline",),
+    59: ("ulcolor",),
+}
+
+
+def _sgr_update(slots: dict, params: str):
+    if not params:
+        slots.clear()  # ESC[m is a reset
+        return
+    parts = params.split(";")
+    i = 0
+    n = len(parts)
+    while i < n:
+        p = parts[i]
+        head = p.split(":", 1)[0]
+        code = int(head) if head.isdigit() else 0
+        if code == 0:
+            slots.clear()
+        elif code in EXT_COLOR_CODES and ":" not in p:
+            # 38;5;n or 38;2;r;g;b
+            mode = parts[i + 1] if i + 1 < n else ""
+            seq_len = 3 if mode == "5" else 5 if mode == "2" else 1
+            slots[_SGR_SLOTS[code]] = ";".join(parts[i:i + seq_len])
+            i += seq_len
+            continue
+        elif code in _SGR_OFF:
+            for slot in _SGR_OFF[code]:
+                slots.pop(slot, None)
+        else:
+            slots[_SGR_SLOTS.get(code, code)] = p
+        i += 1
+
+
+@lru_cache(maxsize=4096)
+def sgr_apply(state: str, params: str) -> str:
+    """
+    Apply the SGR `params` (what's between ESC[ and m) on top of the active style `state`,
+    and return the new state.
+    States are normalized SGR sequences holding only what is still in effect ("" when nothing is),
+    so they can be compared, cached and re-emitted as-is.
+    """
+    slots = {}
+    if state:
+        _sgr_update(slots, state[2:-1])
+    _sgr_update(slots, params)
+    if not slots:
+        return ""
+    return "\x1b[" + ";".join(slots.values()) + "m"
+
+
+@lru_cache(maxsize=4096)
+def sgr_delta(old: str, new: str) -> str:
+    """
+    The shortest SGR sequence turning the style state `old` into `new` (both as returned by `sgr_apply`):
+    only the changed parts when nothing has to be switched off, a reset then `new` otherwise.
+    """
+    if old == new:
+        return ""
+    if not new:
+        return RESET
+    if not old:
+        return new
+    old_slots, new_slots = {}, {}
+    _sgr_update(old_slots, old[2:-1])
+    _sgr_update(new_slots, new[2:-1])
+    if old_slots == new_slots:
+        # the same style, with its codes in another order
+        return ""
+    if not old_slots.keys() <= new_slots.keys():
+        return "\x1b[0;" + new[2:]
+    return "\x1b[" + ";".join(v for k, v in new_slots.items() if old_slots.get(k) != v) + "m"
+
+
+def char_width(ch: str) -> int:
+    """Number of terminal columns a single printable character takes."""
+    if ch < "\u0300":
+        return 1
+    if unicodedata.combining(ch) or ch in "\u200b\u200c\u200d\ufe0e\ufe0f":
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+def text_width(s: str) -> int:
+    """Number of terminal columns the plain (escape-free) text `s` takes."""
+    if s.isascii():
+        return len(s)
+    return sum(map(char_width, s))
+
+
+def visible_width(s: str, pos: int = 0) -> int:
+    """Number of terminal columns s[pos:] takes once printed, ignoring escape sequences."""
+    ascii_only = s.isascii()
+    w = 0
+    for kind, start, end in tokenize(s, pos):
+        if kind is TEXT:
+            w += end - start if ascii_only else text_width(s[start:end])
+    return w
+
+
+def _slice(
+        s: str,
+        start: int,
+        stop: int | None,
+        pos: int = 0,
+        col: int = 0,
+        state: str = "",
+        ascii_only: bool | None = None,
+) -> tuple[list[str], str, int, int]:
+    """
+    Core of `ansi_slice`: scan `s` from offset `pos` (at visible column `col`, with style `state`)
+    and return (pieces, style active at the cut, offset in `s` where the scan stopped, visible column reached).
+    """
+    out: list[str] = []
+    if stop is not None and stop <= start:
+        return out, "", pos, col
+    opened = False
+    if ascii_only is None:
+        ascii_only = s.isascii()
+    for kind, a, b in tokenize(s, pos):
+        if stop is not None and col >= stop:
+            break
+        pos = b
+        if kind is TEXT:
+            w = b - a if ascii_only else text_width(s[a:b])
+            if col + w <= start:
+                col += w
+                continue
+            if not opened:
+                opened = True
+                if state:
+                    out.append(state)
+            if ascii_only:
+                lo = max(0, start - col)
+                hi = w if stop is None else min(w, stop - col)
+                out.append(s[a + lo:a + hi])
+                pos = a + hi
+                col += hi
+                continue
+            for i in range(a, b):
+                if stop is not None and col >= stop:
+                    pos = i
+                    break
+                ch = s[i]
+                cw = char_width(ch)
+                if col >= start and (stop is None or col + cw <= stop):
+                    out.append(ch)
+                elif col < start < col + cw:
+                    right = col + cw if stop is None else min(col + cw, stop)
+                    out.append(" " * (right - start))  # wide char cut on the left
+                elif stop is not None and col < stop < col + cw:
+                    out.append(" " * (stop - col))  # wide char cut on the right
+                col += cw
+        elif kind is CSI and s[b - 1] == "m":
+            state = sgr_apply(state, s[a + 2:b - 1])
+            if opened:
+                out.append(s[a:b])
+        elif opened:
+            out.append(s[a:b])
+    return out, state if opened else "", pos, col
+
+
+def ansi_slice(s: str, start: int = 0, stop: int | None = None) -> str:
+    """
+    Return the visible columns [start, stop) of the single-line string `s`.
+    The style active at `start` is re-opened, and whatever is still active at `stop` is reset,
+    so the result can be printed on its own.
+    """
+    pieces, state, _, _ = _slice(s, start, stop)
+    if state:
+        pieces.append(RESET)
+    return "".join(pieces)
+
+
+class ColumnIndex:
+    """
+    Index of a long styled line, for rendering column windows of it (horizontal scrolling,
+    pagination) in O(window) instead of O(line).
+
+    Every `step` visible columns, a checkpoint records the offset in the string where that
+    column starts and the style active there; `window` then scans from the nearest checkpoint only.
+    """
+
+    def __init__(self, s: str, step: int = 256):
+        self.s = s
+        self.step = max(1, step)
+        self.ascii_only = s.isascii()
+        # (column, offset, style) checkpoints, column increasing
+        self.checkpoints: list[tuple[int, int, str]] = [(0, 0, "")]
+        self.width = self._build()
+
+    def _build(self) -> int:
+        s = self.s
+        step = self.step
+        checkpoints = self.checkpoints
+        state = ""
+        col = 0
+        nxt = step
+        for kind, a, b in tokenize(s):
+            if kind is TEXT:
+                if self.ascii_only:
+                    end_col = col + b - a
+                    while nxt < end_col:
+                        checkpoints.append((nxt, a + nxt - col, state))
+                        nxt += step
+                    col = end_col
+                    continue
+                for i in range(a, b):
+                    cw = char_width(s[i])
+                    if col + cw > nxt:
+                        # a wide char may straddle the checkpoint column: start at the char
+                        checkpoints.append((col, i, state))
+                        nxt += step
+                    col += cw
+            elif kind is CSI and s[b - 1] == "m":
+                state = sgr_apply(state, s[a + 2:b - 1])
+        return col
+
+    def _checkpoint(self, col: int) -> tuple[int, int, str]:
+        k = min(col // self.step, len(self.checkpoints) - 1)
+        while k and self.checkpoints[k][0] > col:
+            k -= 1
+        return self.checkpoints[k]
+
+    def locate(self, col: int) -> tuple[int, str]:
+        """Offset in the string where visible column `col` starts, and the style active there."""
+        c, pos, state = self._checkpoint(col)
+        s = self.s
+        for kind, a, b in tokenize(s, pos):
+            if kind is TEXT:
+                if self.ascii_only:
+                    if c + b - a > col:
+                        return a + col - c, state
+                    c += b - a
+                    continue
+                for i in range(a, b):
+                    cw = char_width(s[i])
+                    if c + cw > col:
+                        return i, state
+                    c += cw
+            elif kind is CSI and s[b - 1] == "m":
+                state = sgr_apply(state, s[a + 2:b - 1])
+        return len(s), state
+
+    def window(self, start: int, stop: int | None = None) -> str:
+        """Same as `ansi_slice(s, start, stop)`, scanning from the nearest checkpoint only."""
+        col, pos, state = self._checkpoint(max(0, start))
+        pieces, state, _, _ = _slice(self.s, start, stop, pos, col, state, self.ascii_only)
+        if state:
+            pieces.append(RESET)
+        return "".join(pieces)
+
+
+def ansi_truncate(s: str, width: int, ellipsis: str = "…") -> str:
+    """
+    Cut the single-line string `s` to at most `width` visible columns, ending it with
+    `ellipsis` (in the style active at the cut) when anything had to be removed.
+    """
+    ew = text_width(ellipsis)
+    if width < ew:
+        ellipsis, ew = "", 0
+    pieces, state, pos, col = _slice(s, 0, max(0, width - ew))
+    if col + visible_width(s, pos) <= width:
+        return s
+    pieces.append(ellipsis)
+    if state:
+        pieces.append(RESET)
+    return "".join(pieces)
+
+
+def ansi_wrap(s: str, width: int) -> list[str]:
+    """
+    Word-wrap `s` to `width` visible columns and return the lines.
+    Styles active at a line break are reset at the end of the line and re-opened on the next one,
+    newlines in `s` are kept, and words longer than `width` are broken.
+    """
+    width = max(1, width)
+    ascii_only = s.isascii()
+    lines: list[str] = []
+    state = ""        # style after the last token read
+    line: list[str] = []
+    line_w = 0
+    line_state = ""   # style after the last piece placed on the line
+    fresh = True      # the line is the first one of an input line (keeps its indentation)
+    word: list[tuple[str, int, str | None]] = []  # (text, width, SGR params) read but not placed
+    word_w = 0
+    word_state = ""   # style at the start of `word`
+    gap = 0           # spaces between the line and the word
+
+    def end_line(st: str):
+        nonlocal line, line_w, fresh
+        if st:
+            line.append(RESET)
+        lines.append("".join(line))
+        line = [st] if st else []
+        line_w = 0
+        fresh = False
+
+    def place():
+        nonlocal line_w, line_state, word_w, gap
+        if word_w and line_w and line_w + gap + word_w > width:
+            end_line(line_state)
+        elif word_w and (line_w or fresh) and line_w + gap + word_w <= width:
+            line.append(" " * gap)
+            line_w += gap
+        if line_w + word_w <= width:
+            for text, w, _ in word:
+                line.append(text)
+            line_w += word_w
+        else:
+            # longer than a line on its own: break it anywhere
+            st = word_state
+            for text, w, params in word:
+                if not w:
+                    line.append(text)
+                    if params is not None:
+                        st = sgr_apply(st, params)
+                    continue
+                for ch in text:
+                    cw = char_width(ch)
+                    if line_w + cw > width and line_w:
+                        end_line(st)
+                    line.append(ch)
+                    line_w += cw
+        line_state = state
+        word.clear()
+        word_w = 0
+        gap = 0
+
+    for kind, a, b in tokenize(s):
+        if kind is TEXT:
+            i = a
+            while i < b:
+                sp = s.find(" ", i, b)
+                if sp == i:
+                    # run of spaces: ends the current word
+                    j = i
+                    while j < b and s[j] == " ":
+                        j += 1
+                    if word:
+                        place()
+                    gap += j - i
+                    i = j
+                    continue
+                j = b if sp < 0 else sp
+                if not word:
+                    word_state = state
+                w = j - i if ascii_only else text_width(s[i:j])
+                word.append((s[i:j], w, None))
+                word_w += w
+                i = j
+        elif kind is CTRL and s[a] == "\n":
+            place()
+            end_line(state)
+            fresh = True
+        else:
+            if not word:
+                word_state = state
+            params = None
+            if kind is CSI and s[b - 1] == "m":
+                params = s[a + 2:b - 1]
+                state = sgr_apply(state, params)
+            word.append((s[a:b], 0, params))
+    place()
+    if line_state:
+        line.append(RESET)
+    lines.append("".join(line))
+    return lines
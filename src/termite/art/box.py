@@ -1,11 +1,13 @@
 from termite.colors import get_color
-from termite.raw import RESET
+from termite.mode import color_enabled
+from termite.raw import RESET as _RESET
 from termite.sim import sim, CellLines
 
 
 def box(text: str, bg: str ="", border: str = "", text_color="black") -> str:
     lines = sim(text)
     width = lines.width
+    RESET = _RESET if color_enabled() else ""
     bg = get_color("", bg) if bg else ""
     bc = get_color(border) if border else ""
     tc = get_color(text_color)
@@ -14,7 +16,7 @@ def box(text: str, bg: str ="", border: str = "", text_color="black") -> str:
     s = top
     for line in lines:
         c = CellLines(line)
-        s += ( bg + bc + "│ " + RESET + bg + tc + c.styled.replace(RESET, RESET+bg+tc) + (width - len(c.raw)) * " " + RESET + bg + bc + " │" + RESET + "\n")
+        s += ( bg + bc + "│ " + RESET + bg + tc + (c.styled.replace(RESET, RESET+bg+tc) if RESET else c.raw) + (width - len(c.raw)) * " " + RESET + bg + bc + " │" + RESET + "\n")
     bottom =  bg + bc + "└" + "─" * (width + 2) + "┘" + RESET
     s += bottom
     return s
@@ -22,12 +24,13 @@ def box(text: str, bg: str ="", border: str = "", text_color="black") -> str:
 def space_box(text: str, bg: str ="", padding: int = 0) -> str:
     lines = sim(text)
     width = lines.width
+    RESET = _RESET if color_enabled() else ""
     bg = get_color("", bg) if bg else ""
 
     s = ""
     for line in lines:
         c = CellLines(line)
-        s += ( bg + " " * padding + c.styled.replace(RESET, RESET+bg) + (width - len(c.raw)) * " "  + " " * padding + RESET + bg  + RESET + "\n")
+        s += ( bg + " " * padding + (c.styled.replace(RESET, RESET+bg) if RESET else c.raw) + (width - len(c.raw)) * " "  + " " * padding + RESET + bg  + RESET + "\n")
     return s
 
 
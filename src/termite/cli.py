@@ -4,13 +4,80 @@ Termite CLI - Command-line interface for terminal formatting.
 """
 
 import argparse
+import codecs
+import sys
+
+from termite.mode import MODES, set_color_mode
+from termite.strip import strip_stream
 from termite.sub import sub, _resolve_file, subprint, ESC_END, ESC, PREFIX, SUFFIX, OPENER, CLOSER, JOINER
 
 
 def raw():
     return main(raw=True)
 
+
+def _read_chunks(path: str, chunk_size: int):
+    """Yield decoded text from `path` ('-' for stdin) in large buffered reads."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    f = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+def strip(argv=None):
+    """`termite strip FILE...`: strip ANSI codes from (possibly huge) files without loading them in memory."""
+    parser = argparse.ArgumentParser(
+        prog="termite strip",
+        description="Strip ANSI colors, styles and cursor movement from files, streaming them in chunks",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        default=["-"],
+        help="Files to strip (use '-' for stdin, default: stdin)"
+    )
+    parser.add_argument("--keep-fg", action="store_true", help="Keep foreground colors")
+    parser.add_argument("--keep-bg", action="store_true", help="Keep background colors")
+    parser.add_argument("--keep-styles", action="store_true", help="Keep styles (bold, italic, etc.)")
+    parser.add_argument("--keep-cursor", action="store_true", help="Keep cursor movement instead of simulating it")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1 << 20,
+        help="Number of bytes read at a time (default: 1MiB)"
+    )
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    for path in args.files:
+        try:
+            for text in strip_stream(
+                    _read_chunks(path, args.chunk_size),
+                    remove_fg_colors=not args.keep_fg,
+                    remove_bg_colors=not args.keep_bg,
+                    remove_styles=not args.keep_styles,
+                    remove_cursor_actions=not args.keep_cursor,
+            ):
+                out.write(text)
+        except OSError as e:
+            out.flush()
+            print(f"Error reading input: {e}", file=sys.stderr)
+            sys.exit(1)
+    out.flush()
+
+
 def main(raw=False):
+    if sys.argv[1:2] == ["strip"]:
+        return strip(sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="Apply terminal formatting (colors, styles, cursor control) to text",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -22,6 +89,7 @@ Examples:
   termite "RED{OPENER}text{CLOSER}" --file /dev/stderr
   termite "GREEN{{text}}" --esc "{{}}"
   termite "GREEN{OPENER}Hello{CLOSER}" --raw
+  termite strip build.log > build.txt
         """
     )
     
@@ -97,6 +165,13 @@ Examples:
         help="Apply the formatting"
     )
 
+    parser.add_argument(
+        "--color",
+        choices=MODES,
+        default=None,
+        help="Emit colors and styles: auto (only to a terminal, honouring NO_COLOR/FORCE_COLOR), always or never"
+    )
+
     parser.add_argument(
         "-w",
         default=None,
@@ -109,6 +184,8 @@ Examples:
     )
     
     args = parser.parse_args()
+    if args.color is not None:
+        set_color_mode(args.color)
     if args.w is not None:
         args.opener = args.w[0] if len(args.w) > 0 else ""
         args.closer = args.w[1] if len(args.w) > 1 else ""
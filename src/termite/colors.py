@@ -1,7 +1,8 @@
 import termite.raw as r
 from termite.cases import cases
 from termite.styles import get_style
-from termite.tc import TerminalCode, TC, to_rgba, BaseColor
+from termite.tc import TerminalCode, TC, to_rgba, BaseColor, PLAIN
+from termite.mode import color_enabled
 
 RESET = TC(r.RESET, "reset", "fg", "bg", "styles")
 
@@ -211,6 +212,8 @@ def get_color(
         style: list[str] | str = "",
         terminal_color: str | None = None
     ):
+    if not color_enabled():
+        return PLAIN
     s = get_style(style)
     if terminal_color is None:
         terminal_color = settings["tc"]
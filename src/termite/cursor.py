@@ -1,23 +1,98 @@
+import os
+import struct
+from functools import lru_cache
 from typing import Literal
 
 DETECT_MODE = "detect"
 CONSOLE_MODE = "console"
 TERMINAL_MODE = "terminal"
 
-def detect():
+# index of string capabilities in compiled terminfo entries (see term.h)
+TERMINFO_STRINGS = {
+    "clear": 5,
+    "el": 6,
+    "ed": 7,
+    "cup": 10,
+    "civis": 13,
+    "cnorm": 16,
+    "smcup": 28,
+    "rmcup": 40,
+    "rc": 126,
+    "sc": 128,
+}
+
+_TERMINFO_MAGIC = 0o432
+_TERMINFO_MAGIC_32BIT = 0o1036  # same layout, with 4 byte numbers
+
+
+def _terminfo_dirs():
+    if os.environ.get("TERMINFO"):
+        yield os.environ["TERMINFO"]
+    yield os.path.expanduser("~/.terminfo")
+    for d in os.environ.get("TERMINFO_DIRS", "").split(os.pathsep):
+        # an empty entry stands for the system directories, which follow anyway
+        if d:
+            yield d
+    yield from ("/etc/terminfo", "/lib/terminfo", "/usr/share/terminfo", "/usr/lib/terminfo", "/usr/share/lib/terminfo")
+
+
+def _terminfo_path(term: str) -> str | None:
+    for d in _terminfo_dirs():
+        for sub in (term[0], f"{ord(term[0]):02x}"):
+            path = os.path.join(d, sub, term)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def _read_terminfo(data: bytes) -> dict[str, str]:
+    """The string capabilities of TERMINFO_STRINGS found in a compiled terminfo entry."""
+    magic, names_size, bools_count, nums_count, strings_count, table_size = struct.unpack("<6h", data[:12])
+    if magic not in (_TERMINFO_MAGIC, _TERMINFO_MAGIC_32BIT):
+        raise ValueError("not a terminfo entry")
+    pos = 12 + names_size + bools_count
+    pos += pos % 2
+    pos += nums_count * (4 if magic == _TERMINFO_MAGIC_32BIT else 2)
+    offsets = struct.unpack(f"<{strings_count}h", data[pos:pos + 2 * strings_count])
+    table = data[pos + 2 * strings_count:pos + 2 * strings_count + table_size]
+    caps = {}
+    for name, i in TERMINFO_STRINGS.items():
+        if i < strings_count and offsets[i] >= 0:
+            start = offsets[i]
+            caps[name] = table[start:table.index(b"\0", start)].decode("latin-1")
+    return caps
+
+
+@lru_cache(maxsize=None)
+def probe(term: str | None = None) -> dict[str, str]:
+    """
+    String capabilities (see TERMINFO_STRINGS) of `term` (default: $TERM), read from its terminfo entry.
+    Runs once per terminal type, on first use; returns {} if the terminal is unknown.
+    """
+    term = term if term is not None else os.environ.get("TERM", "")
+    path = _terminfo_path(term) if term else None
+    if path is None:
+        return {}
     try:
-        import curses
-        curses.setupterm()
-        _sc = curses.tigetstr("sc")  # save cursor
-        _rc = curses.tigetstr("rc")  # restore cursor
-        SAVE_CURSOR_DETECTED = _sc.decode() if _sc else ""
-        RESTORE_CURSOR_DETECTED = _rc.decode() if _rc else ""
-        return SAVE_CURSOR_DETECTED, RESTORE_CURSOR_DETECTED
-    except:
-        return "", ""
+        with open(path, "rb") as f:
+            return _read_terminfo(f.read())
+    except (OSError, ValueError, struct.error):
+        return {}
 
-# SAVE_CURSOR_DETECTED, RESTORE_CURSOR_DETECTED = "", ""
-SAVE_CURSOR_DETECTED, RESTORE_CURSOR_DETECTED = detect()
+
+def detect():
+    """Save and restore cursor sequences of the terminal, or empty strings if unknown."""
+    caps = probe()
+    return caps.get("sc", ""), caps.get("rc", "")
+
+
+def __getattr__(name):
+    # kept for compatibility, without probing the terminal at import
+    if name == "SAVE_CURSOR_DETECTED":
+        return detect()[0]
+    if name == "RESTORE_CURSOR_DETECTED":
+        return detect()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 CARRIAGE_RETURN = "\r"
@@ -27,7 +102,8 @@ ERASE_LINE="\033[2K"
 
 
 settings = {
-    "cursor_mode": DETECT_MODE
+    # TERMITE_CURSOR_MODE=terminal|console skips probing the terminal
+    "cursor_mode": os.environ.get("TERMITE_CURSOR_MODE", DETECT_MODE)
 }
 
 def set_cursor_mode(s: Literal["terminal", "console", "detect"]):
@@ -41,12 +117,12 @@ RESTORE_CURSOR_CONSOLE = "\033[u"
 
 def save():
     c = settings["cursor_mode"]
-    return SAVE_CURSOR_DETECTED if c == DETECT_MODE else SAVE_CURSOR_TERMINAL if c == TERMINAL_MODE else SAVE_CURSOR_CONSOLE
+    return detect()[0] if c == DETECT_MODE else SAVE_CURSOR_TERMINAL if c == TERMINAL_MODE else SAVE_CURSOR_CONSOLE
 
 
 def restore():
     c = settings["cursor_mode"]
-    return RESTORE_CURSOR_DETECTED if c == DETECT_MODE else  RESTORE_CURSOR_TERMINAL if c == TERMINAL_MODE else RESTORE_CURSOR_CONSOLE
+    return detect()[1] if c == DETECT_MODE else  RESTORE_CURSOR_TERMINAL if c == TERMINAL_MODE else RESTORE_CURSOR_CONSOLE
 
 def left(n=1):
     return f"\033[{n}D"
@@ -130,14 +206,16 @@ _consts = {
     "ERASE_LINE": ERASE_LINE,
     "CLEAR_REST": CLEAR_REST_OF_LINE,
     "CLEAR_REST_OF_LINE": CLEAR_REST_OF_LINE,
-    "SAVE": save(),
-    "RESTORE": restore()
+    # resolved on use, so importing doesn't probe the terminal
+    "SAVE": save,
+    "RESTORE": restore
 }
 
 class CursorConsts:
     def __getitem__(self, item):
         k = item.upper().replace("_", "")
-        return _consts[k]
+        v = _consts[k]
+        return v() if callable(v) else v
 
     def __getattr__(self, item):
         return self[item]
@@ -1,6 +1,7 @@
 from termite.colors import FGColors, BGColors, get_color, FGRGBTerminalCode, BGRGBTerminalCode, settings, demo_color, register_terminal_color
-from termite.tc import TerminalCode, BaseColor
+from termite.tc import TerminalCode, BaseColor, PLAIN
 from termite.raw import RESET
+from termite.mode import color_enabled, color_mode, set_color_mode, get_color_mode
 from termite.cases import cases
 from termite.cursor import cursor
 from termite.emojis import emojis
@@ -19,12 +20,17 @@ class FancyText:
     cursor = cursor
     emojis = emojis
     unicode = unicode
-    reset = RESET
-    RESET = RESET
-    rst = RESET
-    RST = RESET
+
+    @property
+    def reset(self):
+        return RESET if color_enabled() else ""
+
+    RESET = rst = RST = reset
 
     demo_color=staticmethod(demo_color)
+    color_mode = staticmethod(color_mode)
+    set_color_mode = staticmethod(set_color_mode)
+    get_color_mode = staticmethod(get_color_mode)
     register_terminal_color = staticmethod(register_terminal_color)
     get_color = staticmethod(get_color)
 
@@ -55,6 +61,8 @@ class FancyText:
             return self.emojis[item]
         if item in self.unicode:
             return self.unicode[item]
+        if not color_enabled():
+            return PLAIN
         s = get_style(item)
         if s:
             return s
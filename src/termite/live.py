@@ -0,0 +1,168 @@
+import sys
+import threading
+import time
+
+from termite.terminal import cprint, global_state, stream_state
+
+
+class LiveLine:
+    """
+    A frame-rate-limited `cprint`: draws at most `max_fps` frames per second.
+
+    Updates that arrive faster than that replace the pending frame instead of being drawn,
+    and a background timer draws the latest one once the interval has passed.
+    Keyword arguments given here are passed to every `cprint` call.
+
+    ```python
+    live = LiveLine(max_fps=30)
+    for i in range(100_000):
+        live(f"processed {i}")
+    live.flush()  # make sure the last state is on screen
+    ```
+    """
+
+    def __init__(self, max_fps: float = 30, **kw):
+        self.interval = 1 / max_fps if max_fps else 0
+        self.kw = kw
+        self.text = ""  # what cprint returned for the last drawn frame
+        self._lock = threading.Lock()
+        self._pending = None  # (args, kwargs) of the latest frame not drawn yet
+        self._timer = None
+        self._last = float("-inf")  # time.monotonic() of the last draw
+
+    def __call__(self, *pre: str, **kw) -> bool:
+        """Takes the same arguments as `cprint`. Returns True if the frame was drawn right away."""
+        with self._lock:
+            self._pending = (pre, {**self.kw, **kw})
+            wait = self._last + self.interval - time.monotonic()
+            if wait <= 0:
+                self._draw()
+                return True
+            if self._timer is None:
+                self._schedule(wait)
+            return False
+
+    update = __call__
+
+    def _schedule(self, wait: float):
+        self._timer = threading.Timer(wait, self._tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _tick(self):
+        with self._lock:
+            self._timer = None
+            if self._pending is None:
+                return
+            wait = self._last + self.interval - time.monotonic()
+            if wait > 0:  # a frame was drawn directly since this timer was set
+                self._schedule(wait)
+            else:
+                self._draw()
+
+    def _draw(self):
+        pre, kw = self._pending
+        self._pending = None
+        self.text = cprint(*pre, **kw)
+        self._last = time.monotonic()
+
+    def flush(self):
+        """Draw the pending frame now, if there is one."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is not None:
+                self._draw()
+
+    close = flush
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+class LiveDisplay:
+    """
+    Several independent live regions (progress lines, per-worker status, a footer...) drawn together as one
+    `cprint` frame, at most `max_fps` times per second.
+
+    Regions are drawn in the order they were added, and empty regions take no room.
+    Any thread can update its own region; other processes can send `(name, text)` pairs through `queue`
+    (a `queue.Queue` or `multiprocessing.Queue`), which is drained by a background thread.
+    Other keyword arguments are passed to `cprint`.
+
+    ```python
+    with LiveDisplay("progress", "workers", "footer") as live:
+        live.update("footer", "press ctrl+c to stop")
+        live["progress"] = "3/10 done"
+    ```
+    """
+
+    def __init__(self, *regions: str, max_fps: float = 20, queue=None, diff: bool = True, **kw):
+        self.regions: dict[str, str] = dict.fromkeys(regions, "")
+        self.queue = queue
+        self.kw = kw
+        self._lock = threading.Lock()
+        self._live = LiveLine(max_fps=max_fps, diff=diff, **kw)
+        self._thread = None
+        if queue is not None:
+            self._thread = threading.Thread(target=self._drain, name="termite-live", daemon=True)
+            self._thread.start()
+
+    def add(self, name: str, text: str = ""):
+        """Add a region below the existing ones."""
+        self.update(name, text)
+
+    def remove(self, name: str):
+        with self._lock:
+            if self.regions.pop(name, None):
+                self._live(self.render())
+
+    def update(self, name: str, text: str):
+        """Set the text of a region, adding it if it is new."""
+        with self._lock:
+            if name in self.regions and self.regions[name] == text:
+                return
+            self.regions[name] = text
+            self._live(self.render())
+
+    __setitem__ = update
+
+    def __getitem__(self, name: str) -> str:
+        return self.regions[name]
+
+    def render(self) -> str:
+        return "\n".join(text for text in self.regions.values() if text)
+
+    def _drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            self.update(*item)
+
+    def close(self):
+        """Stop draining the queue, draw the last frame and move below it."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._live.flush()
+        file = self.kw.get("file", sys.stdout)
+        # the next cprint to this stream starts below, instead of overwriting the display
+        state = self.kw.get("state", global_state)
+        state = stream_state(file) if state is global_state else state
+        if state is not None:
+            state.clear()
+        print_ = self.kw.get("print", print)
+        if print_ is not None:
+            print_("", file=file, flush=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,146 @@
+"""
+Logging with `sub` markup in format strings.
+
+```python
+import logging
+from termite.logging import TermiteHandler
+
+logging.getLogger().addHandler(TermiteHandler(
+    "GRAY[%(asctime)s] BOLD[%(levelname)s] %(message)s",
+    level_formats={"ERROR": "GRAY[%(asctime)s] BOLDRED[%(levelname)s] RED[%(message)s]"},
+))
+```
+
+Templates go through `sub()` once per level (and color mode), never per record,
+and records are written by a background thread, so logging calls return right away.
+"""
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+
+from termite.mode import color_enabled, color_mode, ALWAYS, NEVER
+from termite.sub import sub
+
+# placeholders of each logging format style, kept away from sub() (whose escape char is %)
+_FIELD_RE = {
+    "%": re.compile(r"%\(\w+\)[#0+ -]*\d*(?:\.\d+)?[diouxXeEfFgGcrsa]|%%"),
+    "{": re.compile(r"\{[^{}]*\}|\{\{|\}\}"),
+    "$": re.compile(r"\$\{\w+\}|\$\w+|\$\$"),
+}
+# the format of each style when none is given, as in `logging.Formatter`
+_DEFAULT_FORMATS = {"%": "%(message)s", "{": "{message}", "$": "${message}"}
+_SENTINEL = 0xE000  # private use area
+
+
+def _check_style(style: str):
+    if style not in _FIELD_RE:
+        raise ValueError(f"Style must be one of: {', '.join(_FIELD_RE)}")
+
+
+def compile_format(fmt: str, style: str = "%", **sub_kw) -> str:
+    """Apply `sub()` to a logging format string, leaving its placeholders untouched."""
+    _check_style(style)
+    fields = []
+
+    def protect(m):
+        fields.append(m.group(0))
+        return chr(_SENTINEL + len(fields) - 1)
+
+    s = sub(_FIELD_RE[style].sub(protect, fmt), **sub_kw)
+    for i, field in enumerate(fields):
+        s = s.replace(chr(_SENTINEL + i), field)
+    return s
+
+
+def _level(level: int | str) -> int:
+    return level if isinstance(level, int) else logging.getLevelName(level.upper())
+
+
+class TermiteFormatter(logging.Formatter):
+    """
+    A `logging.Formatter` whose format strings are written in `sub` markup,
+    with an optional format per level (`level_formats`, keyed by level number or name).
+    """
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None, style: str = "%",
+                 level_formats: dict[int | str, str] | None = None, **sub_kw):
+        _check_style(style)
+        super().__init__(fmt, datefmt, style)
+        self.fmt = fmt or _DEFAULT_FORMATS[style]
+        self.style = style
+        self.level_formats = {_level(k): v for k, v in (level_formats or {}).items()}
+        self.sub_kw = sub_kw
+        self._compiled = {}  # (levelno, colors on) -> formatter of the compiled format
+
+    def _formatter_for(self, levelno: int) -> logging.Formatter:
+        key = (levelno, color_enabled())
+        formatter = self._compiled.get(key)
+        if formatter is None:
+            fmt = compile_format(self.level_formats.get(levelno, self.fmt), self.style, **self.sub_kw)
+            # the main format is validated by __init__, and a level format may have no field
+            formatter = self._compiled[key] = logging.Formatter(fmt, style=self.style, validate=False)
+        return formatter
+
+    def format(self, record: logging.LogRecord) -> str:
+        formatter = self._formatter_for(record.levelno)
+        record.message = record.getMessage()
+        if formatter.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        s = formatter.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + self.formatStack(record.stack_info)
+        return s
+
+
+class _StreamHandler(logging.StreamHandler):
+    """Formats with colors only if its stream takes them (in auto mode)."""
+
+    def format(self, record):
+        with color_mode(ALWAYS if color_enabled(self.stream) else NEVER):
+            return super().format(record)
+
+
+class TermiteHandler(logging.handlers.QueueHandler):
+    """
+    Log handler writing records formatted by a `TermiteFormatter` to `stream` (stderr by default).
+
+    Logging calls only put the record on a queue; a `QueueListener` thread formats and writes it.
+    Call `close()` (done by `logging.shutdown()` at exit) to flush what is left.
+    """
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None, style: str = "%",
+                 level_formats: dict[int | str, str] | None = None, stream=None, level=logging.NOTSET,
+                 queue_=None, **sub_kw):
+        super().__init__(queue_ if queue_ is not None else queue.SimpleQueue())
+        self.setLevel(level)
+        self.target = _StreamHandler(stream if stream is not None else sys.stderr)
+        self.target.setFormatter(TermiteFormatter(fmt, datefmt, style, level_formats, **sub_kw))
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt: logging.Formatter | None):
+        # formatting happens in the listener
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only merge the args, so they can't change before the listener gets to the record
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
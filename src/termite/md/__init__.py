@@ -6,36 +6,54 @@ syntax highlighting, and extensible handler system.
 """
 
 import argparse
+import codecs
 import sys
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterable, Optional
 
+from termite.mode import MODES, ALWAYS, NEVER, color_enabled, color_mode, set_color_mode
+from . import cache
 from .renderer import MarkdownRenderer
+from .parser import Block, split_blocks
+from .incremental import IncrementalRenderer
+from .pager import Pager
+from .handlers.syntax import markup
 
 # Default renderer instance
 _default_renderer = MarkdownRenderer()
 
 
-def render(markdown: str) -> str:
+def render(markdown: str, workers: Optional[int] = None) -> str:
     """
     Render markdown to styled terminal text using the default renderer.
     
     Args:
         markdown: The markdown text to render
+        workers: Render code blocks and big headers in this many processes (see `MarkdownRenderer.render`)
     
     Returns:
         Rendered styled text (ready to print)
     """
-    return _default_renderer.render(markdown)
+    return _default_renderer.render(markdown, workers)
 
 
-def register_handler(pattern: str, handler: Callable[[str, Dict], str]):
+def render_stream(chunks: Iterable[str], file=None, max_fps: float = 30) -> str:
+    """
+    Render markdown arriving in chunks with the default renderer, writing each block as soon as it is complete.
+    See `MarkdownRenderer.render_stream`.
+    """
+    return _default_renderer.render_stream(chunks, file, max_fps)
+
+
+def register_handler(pattern: str, handler: Callable[[str, Dict], str], nested: bool = True, final: bool = False):
     """
     Register a custom handler with the default renderer.
     
     Args:
         pattern: A regex pattern to match (should include capturing groups)
         handler: A function that takes (match_text, groups_dict) and returns termite formatting string
+        nested: Render markdown within the `text` group before passing it to the handler
+        final: The handler returns final styled text (ANSI codes), not termite formatting strings
     
     Example:
         from termite.md import register_handler
@@ -45,7 +63,12 @@ def register_handler(pattern: str, handler: Callable[[str, Dict], str]):
             lambda text, groups: f"STRIKETHROUGH[{groups['text']}]"
         )
     """
-    _default_renderer.register_handler(pattern, handler)
+    _default_renderer.register_handler(pattern, handler, nested, final)
+
+
+def unregister_handler(pattern: str):
+    """Remove a handler from the default renderer."""
+    _default_renderer.unregister_handler(pattern)
 
 
 def register_syntax_highlighter(language: str, highlighter: Callable[[list[str]], list[str]]):
@@ -54,14 +77,16 @@ def register_syntax_highlighter(language: str, highlighter: Callable[[list[str]]
     
     Args:
         language: Language name (e.g., 'python', 'bash', 'javascript')
-        highlighter: Function that takes a list of code lines and returns a list of styled lines
+        highlighter: Function that takes a list of code lines and returns a list of styled lines,
+                     with the parts to style wrapped with `markup(style, text)`
     
     Example:
-        from termite.md import register_syntax_highlighter
+        import re
+        from termite.md import markup, register_syntax_highlighter
         
         def highlight_rust(lines):
             # Custom Rust highlighting
-            return styled_lines
+            return [re.sub(r'\\bfn\\b', lambda m: markup('BOLDMAGENTA', m.group(0)), line) for line in lines]
         
         register_syntax_highlighter('rust', highlight_rust)
     """
@@ -93,6 +118,19 @@ def _resolve_file(file_arg: str):
         return open(file_arg, "w")
 
 
+def _read_chunks(file, size: int = 4096):
+    """Yield text from a file as soon as it is available, instead of waiting for `size` characters."""
+    buffer = getattr(file, 'buffer', None)
+    if buffer is None:
+        yield from iter(lambda: file.read(size), '')
+        return
+    decoder = codecs.getincrementaldecoder(getattr(file, 'encoding', None) or 'utf-8')(errors='replace')
+    read = getattr(buffer, 'read1', buffer.read)
+    while chunk := read(size):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
 def main():
     """CLI entry point for markdown renderer."""
     parser = argparse.ArgumentParser(
@@ -104,6 +142,8 @@ Examples:
   python -m termite.md README.md --output rendered.txt
   python -m termite.md README.md --file stderr
   cat README.md | python -m termite.md -
+  llm "explain this" | python -m termite.md --stream
+  python -m termite.md --pager big-report.md
         """
     )
     
@@ -132,31 +172,105 @@ Examples:
         action="store_true",
         help="Output raw ANSI codes instead of processing through termite"
     )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Render each block as soon as it is complete, redrawing the incomplete one in place"
+    )
+
+    parser.add_argument(
+        "--pager",
+        action="store_true",
+        help="Scroll through the document full-screen, rendering only what is viewed (when writing to a terminal)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't use the on-disk cache of rendered files (in $XDG_CACHE_HOME/termite/md)"
+    )
+
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Render code blocks and big headers in this many processes (for large documents)"
+    )
+
+    parser.add_argument(
+        "--color",
+        choices=MODES,
+        default=None,
+        help="Emit colors and styles: auto (only to a terminal, honouring NO_COLOR/FORCE_COLOR), always or never"
+    )
     
     args = parser.parse_args()
+    if args.stream and args.pager:
+        parser.error("--stream and --pager can't be combined")
+    if args.color is not None:
+        set_color_mode(args.color)
     
-    # Read input
+    # Read input (with --stream, it is read while rendering)
     if args.file == "-" or args.file is None:
         # Read from stdin
-        markdown_text = sys.stdin.read()
+        input_file = sys.stdin
     else:
         # Read from file
         file_path = Path(args.file)
         if not file_path.exists():
             print(f"Error: File '{args.file}' not found", file=sys.stderr)
             sys.exit(1)
-        markdown_text = file_path.read_text()
+        input_file = open(file_path)
+    if not args.stream:
+        markdown_text = input_file.read()
+        if input_file is not sys.stdin:
+            input_file.close()
     
-    # Render markdown
     try:
-        rendered = render(markdown_text)
+        output_file = _resolve_file(args.output)
     except Exception as e:
-        print(f"Error rendering markdown: {e}", file=sys.stderr)
+        print(f"Error writing output: {e}", file=sys.stderr)
         sys.exit(1)
+
+    if args.pager and output_file is sys.stdout and sys.stdout.isatty():
+        name = "stdin" if input_file is sys.stdin else args.file
+        try:
+            Pager(markdown_text, _default_renderer, name=name).run()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.stream:
+        try:
+            rendered = render_stream(_read_chunks(input_file), output_file)
+        except Exception as e:
+            print(f"Error rendering markdown: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not rendered.endswith('\n'):
+            output_file.write('\n')
+        output_file.flush()
+        if output_file not in (sys.stdout, sys.stderr):
+            output_file.close()
+        return
+
+    # Render markdown, in color only if the output takes it (in auto mode)
+    color = color_enabled(output_file)
+    # Files are cached; stdin is usually different every time
+    key = None if args.no_cache or input_file is sys.stdin else cache.cache_key(markdown_text, _default_renderer, color)
+    rendered = cache.load(key) if key else None
+    if rendered is None:
+        try:
+            with color_mode(ALWAYS if color else NEVER):
+                rendered = render(markdown_text, args.workers)
+        except Exception as e:
+            print(f"Error rendering markdown: {e}", file=sys.stderr)
+            sys.exit(1)
+        if key:
+            cache.store(key, rendered)
     
     # Write output
     try:
-        output_file = _resolve_file(args.output)
         output_file.write(rendered)
         if not rendered.endswith('\n'):
             output_file.write('\n')
@@ -175,9 +289,16 @@ if __name__ == "__main__":
 
 __all__ = [
     'MarkdownRenderer',
+    'IncrementalRenderer',
+    'Pager',
+    'Block',
+    'split_blocks',
     'render',
+    'render_stream',
     'register_handler',
+    'unregister_handler',
     'register_syntax_highlighter',
+    'markup',
     'create_renderer',
     'main',
 ]
@@ -0,0 +1,113 @@
+"""
+On-disk cache of rendered markdown, used by `termite-md FILE`.
+
+Entries live in $XDG_CACHE_HOME/termite/md (~/.cache/termite/md by default), one file per rendering,
+named after a hash of everything the output depends on: the markdown itself, the renderer's
+configuration (terminal width, handlers, highlighters), the color mode, the termite version and the
+modification times of termite's source files and of the modules defining the handlers (so editing
+a handler in a development install doesn't serve stale renderings).
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from importlib import metadata
+from pathlib import Path
+
+MAX_ENTRIES = 256
+
+
+def cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "termite" / "md"
+
+
+def _version() -> str:
+    try:
+        return metadata.version("modularizer-termite")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _name(obj) -> str:
+    return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', type(obj).__qualname__)}"
+
+
+def renderer_config(renderer) -> str:
+    """Describe what a renderer's output depends on, besides the markdown."""
+    parts = [f"renderer {_name(type(renderer))}", f"width {renderer.terminal_width}"]
+    parts += [f"handler {pattern!r} {_name(handler)} {pattern in renderer._flat} {pattern in renderer._final}"
+              for pattern, handler in renderer.handlers.items()]
+    parts += [f"highlighter {language} {_name(highlighter)}"
+              for language, highlighter in sorted(renderer._syntax_highlighters.items())]
+    return "\n".join(parts)
+
+
+def source_stamp(renderer) -> str:
+    """The path, modification time and size of termite's source files and of the handlers' modules."""
+    package = Path(__file__).resolve().parent.parent
+    paths = set(package.rglob("*.py"))
+    functions = [*renderer.handlers.values(), *renderer._syntax_highlighters.values()]
+    for module in {getattr(function, "__module__", None) for function in functions}:
+        path = getattr(sys.modules.get(module), "__file__", None)
+        if path:
+            paths.add(Path(path).resolve())
+    parts = []
+    for path in sorted(paths):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        parts.append(f"{path} {st.st_mtime_ns} {st.st_size}")
+    return "\n".join(parts)
+
+
+def cache_key(markdown: str, renderer, color: bool) -> str:
+    digest = hashlib.sha256()
+    for part in (_version(), renderer_config(renderer), source_stamp(renderer), f"color {color}", markdown):
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load(key: str) -> str | None:
+    """The cached rendering for `key`, or None."""
+    try:
+        return (cache_dir() / key).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def store(key: str, rendered: str):
+    """Cache a rendering. Failures (e.g. a read-only home) are ignored: the cache only saves time."""
+    directory = cache_dir()
+    tmp = None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(rendered)
+        # readers only ever see complete entries
+        os.replace(tmp, directory / key)
+        tmp = None
+        _prune(directory)
+    except OSError:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _prune(directory: Path):
+    """Delete the least recently written entries beyond MAX_ENTRIES."""
+    entries = [entry for entry in os.scandir(directory) if not entry.name.startswith(".")]
+    if len(entries) <= MAX_ENTRIES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - MAX_ENTRIES]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
@@ -6,6 +6,7 @@ from .code import register_code_handlers
 from .links import register_link_handlers
 from .lists import register_list_handlers
 from .blocks import register_block_handlers
+from .tables import register_table_handlers
 
 __all__ = [
     'register_header_handlers',
@@ -14,6 +15,7 @@ __all__ = [
     'register_link_handlers',
     'register_list_handlers',
     'register_block_handlers',
+    'register_table_handlers',
 ]
 
 
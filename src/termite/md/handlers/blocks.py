@@ -2,6 +2,8 @@
 
 from typing import Dict
 
+from ..parser import HR_PATTERN, QUOTE_PATTERN
+
 
 def register_block_handlers(renderer):
     """Register block-level handlers."""
@@ -12,13 +14,14 @@ def register_block_handlers(renderer):
         terminal_width = getattr(renderer, 'terminal_width', 80)
         return '\n' + "GRAY[" + "─" * terminal_width + "]" + '\n'
     
-    renderer.register_handler(r'^[\-\*]{3,}$', hr_handler)
+    renderer.register_handler(HR_PATTERN, hr_handler)
     
     # Blockquotes (> text)
     def blockquote_handler(text: str, groups: Dict) -> str:
         content = groups.get('text', '').strip()
         lines = content.split('\n')
-        return '\n'.join(f"  GRAY[│] GRAY[{line}]" for line in lines if line) + '\n'
+        # an empty quote line (a paragraph break) keeps the bar
+        return '\n'.join(f"  GRAY[│] GRAY[{line}]" if line else "  GRAY[│]" for line in lines) + '\n'
     
-    renderer.register_handler(r'^>\s+(?P<text>.*?)$', blockquote_handler)
+    renderer.register_handler(QUOTE_PATTERN, blockquote_handler)
 
@@ -2,8 +2,50 @@
 
 from typing import Dict
 
-from termite import box, sub
+from termite.ansi import CTRL, TEXT, text_width, tokenize, visible_width
 from termite.art.box import indent_text
+from termite.colors import get_color
+from termite.mode import color_enabled
+from termite.raw import RESET
+from .syntax import styled_code
+
+
+def expand_tabs(line: str, tabsize: int = 8) -> str:
+    """Replace the tabs of a styled line by spaces, up to the next tab stop as the terminal would."""
+    if '\t' not in line:
+        return line
+    out = []
+    col = 0
+    for kind, start, end in tokenize(line):
+        if kind is TEXT:
+            col += text_width(line[start:end])
+        elif kind is CTRL and line[start] == '\t':
+            n = tabsize - col % tabsize
+            out.append(' ' * n)
+            col += n
+            continue
+        out.append(line[start:end])
+    return ''.join(out)
+
+
+def code_box(lines: list[str], bg: str = "#eee", text_color: str = "black") -> str:
+    """
+    Draw a box around styled lines, like `box()`, but measuring them directly instead of simulating a terminal.
+    The lines must not contain cursor movements.
+    """
+    # tabs would be expanded by the terminal, after the box was measured
+    lines = [expand_tabs(line) for line in lines]
+    width = max((visible_width(line) for line in lines), default=0)
+    reset = RESET if color_enabled() else ""
+    bg = str(get_color("", bg)) if bg else ""
+    tc = str(get_color(text_color))
+    out = [bg + "┌" + "─" * (width + 2) + "┐" + reset]
+    for line in lines:
+        # keep the background and text color after resets within the line
+        body = line.replace(RESET, RESET + bg + tc) if reset else line
+        out.append(bg + "│ " + reset + bg + tc + body + " " * (width - visible_width(line)) + reset + bg + " │" + reset)
+    out.append(bg + "└" + "─" * (width + 2) + "┘" + reset)
+    return "\n".join(out)
 
 
 def register_code_handlers(renderer):
@@ -14,10 +56,10 @@ def register_code_handlers(renderer):
         content = groups.get('text', '')
         return f"BGGRAYGRAY[{content}]"
     
-    renderer.register_handler(r'`(?P<text>[^`]+?)`', code_handler)
+    renderer.register_handler(r'`(?P<text>[^`]+?)`', code_handler, nested=False)
     
     # Code blocks are handled separately in the renderer
-    # This function sets up the code block handler
+    # This function sets up the code block handler, which returns final text
     def code_block_handler(text: str, groups: Dict) -> str:
         content = groups.get('text', '').strip()
         lang = groups.get('lang', '').strip().lower()
@@ -25,8 +67,8 @@ def register_code_handlers(renderer):
 
         # Apply syntax highlighting based on language
         highlighted_lines = renderer._highlight_code(lines, lang)
-        content = sub("\n".join(highlighted_lines))
-        return indent_text(box(content, bg="#eee"), "    ") + '\n'
+        styled = [styled_code(line) for line in highlighted_lines]
+        return indent_text(code_box(styled), "    ") + '\n'
     
     renderer._code_block_handler = code_block_handler
 
@@ -43,4 +85,17 @@ class Example:
     def greet(self):
         print(f"Hello, {self.name}!")
 ```
-'''))
\ No newline at end of file
+'''))
+    # the code is shown as it is, brackets, '%' and termite names included, with or without colors
+    from termite.mode import ALWAYS, NEVER, color_mode
+    from termite.strip import strip_text
+    code = {
+        'python': ['def  f(a=[]):', 'x = [1, 2]', 'd["k"] = f(a[0]) % 3  # [note] 50%', 's = sub("BOLDRED[a+b] rgb[255,0,0][c]")'],
+        'bash': ['if [ -f a ]; then echo "${x[0]}"; fi', 'echo 100% [done] RED[x]'],
+    }
+    for lang, lines in code.items():
+        for mode in (ALWAYS, NEVER):
+            with color_mode(mode):
+                out = strip_text(render(f"```{lang}\n" + "\n".join(lines) + "\n```\n"))
+            shown = [line.strip()[2:-2].rstrip() for line in out.split("\n") if line.strip().startswith("│")]
+            assert shown == lines, (lang, mode, shown)
@@ -2,14 +2,28 @@
 
 from typing import Dict
 
+from termite.mode import color_enabled
+from termite.raw import RESET, BOLD, BLACK, GRAY, LIGHT_GRAY, BRIGHT_BLACK, WHITE
+from ..parser import HEADER_PATTERN
+
 # Lazy imports to avoid circular dependencies
 def _get_big_text():
     from termite.art.big import big_text
     return big_text
 
-def _get_termite_colors():
-    from termite.fancy import t
-    return t
+def _get_sub():
+    from termite.sub import sub
+    return sub
+
+
+# Styles of h2-h6
+HEADER_STYLES = {
+    2: BOLD + BLACK,
+    3: BOLD + GRAY,
+    4: BOLD + LIGHT_GRAY,
+    5: BOLD + BRIGHT_BLACK,
+    6: BOLD + WHITE,
+}
 
 
 def register_header_handlers(renderer):
@@ -20,41 +34,22 @@ def register_header_handlers(renderer):
         content = groups.get('text', '').strip()
         # Get terminal width from renderer
         terminal_width = getattr(renderer, 'terminal_width', 80)
+        color = color_enabled()
+        reset = RESET if color else ''
+        rule_style = GRAY if color else ''
         
         if level == 1:
-            # h1: Use BIG text followed by dashes
-            # Call big_text directly to avoid sub() duplication issues
-            big_text = _get_big_text()
-            big_output = big_text(content)
-            # Use terminal width for dash line
+            # h1: BIG text followed by dashes across the terminal
+            big_output = _get_big_text()(content)
+            return f"\n{big_output}\n{rule_style}{'─' * terminal_width}{reset}\n"
+        
+        # h2 and h3 are underlined across the terminal, smaller headers across their content
+        if level in (2, 3):
             width = terminal_width
-            # Escape the BIG output to prevent sub() from processing it
-            escaped_big = big_output.replace('[', '%[').replace(']', '%]')
-            return f"\n{escaped_big}\nGRAY[{'─' * width}]\n"
         else:
-            # For h2-h6, apply styling directly to avoid sub() duplication issues
-            # We'll return a special marker that the renderer will handle
-            # Use terminal width for h2 and h3, content width for others
-            if level in (2, 3):
-                width = terminal_width
-            else:
-                width = max(len(content), 70)
-            dash_line = '─' * width
-            
-            # Use a special format that won't be processed by sub()
-            # The renderer will handle these specially
-            # Use a unique marker for dashes that won't conflict
-            if level == 2:
-                # Return raw content with a marker - renderer will style it
-                return f"\n__HEADER_H2__{content}__END__\n__UNDERLINE__{dash_line}__END__\n"
-            elif level == 3:
-                return f"\n__HEADER_H3__{content}__END__\n__UNDERLINE__{dash_line}__END__\n"
-            elif level == 4:
-                return f"\n__HEADER_H4__{content}__END__\n__UNDERLINE__{dash_line}__END__\n"
-            elif level == 5:
-                return f"\n__HEADER_H5__{content}__END__\n__UNDERLINE__{dash_line}__END__\n"
-            else:
-                return f"\n__HEADER_H6__{content}__END__\n__UNDERLINE__{dash_line}__END__\n"
+            width = max(len(content), 70)
+        style = HEADER_STYLES[level] if color else ''
+        # The output is final: termite formatting in the content is applied here
+        return f"\n{style}{_get_sub()(content)}{reset}\n{rule_style}{'─' * width}{reset}\n"
     
-    renderer.register_handler(r'^(?P<level>#{1,6})\s+(?P<text>.*)$', header_handler)
-
+    renderer.register_handler(HEADER_PATTERN, header_handler, final=True)
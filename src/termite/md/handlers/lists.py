@@ -2,6 +2,8 @@
 
 from typing import Dict
 
+from ..parser import BULLET_PATTERN, ORDERED_PATTERN
+
 
 def register_list_handlers(renderer):
     """Register list handlers."""
@@ -11,7 +13,7 @@ def register_list_handlers(renderer):
         content = groups.get('text', '').strip()
         return f"  YELLOW[•] {content}"
     
-    renderer.register_handler(r'^[\-\*]\s+(?P<text>.*?)$', list_item_handler)
+    renderer.register_handler(BULLET_PATTERN, list_item_handler)
     
     # Ordered lists (1. item)
     def ordered_list_handler(text: str, groups: Dict) -> str:
@@ -19,7 +21,7 @@ def register_list_handlers(renderer):
         content = groups.get('text', '').strip()
         return f"  CYAN[{num}.] {content}"
     
-    renderer.register_handler(r'^(?P<num>\d+)\.\s+(?P<text>.*?)$', ordered_list_handler)
+    renderer.register_handler(ORDERED_PATTERN, ordered_list_handler)
 
 
 
@@ -3,11 +3,14 @@
 from .python import highlight_python
 from .bash import highlight_bash
 from .generic import highlight_generic
+from .markup import markup, styled_code
 
 __all__ = [
     'highlight_python',
     'highlight_bash',
     'highlight_generic',
+    'markup',
+    'styled_code',
 ]
 
 
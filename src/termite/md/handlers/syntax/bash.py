@@ -2,6 +2,8 @@
 
 import re
 
+from .markup import markup
+
 
 def highlight_bash(lines: list[str]) -> list[str]:
     """Bash/shell syntax highlighting."""
@@ -27,23 +29,22 @@ def highlight_bash(lines: list[str]) -> list[str]:
             styled_lines.append('')
             continue
         
-        escaped = line.replace('[', '%[').replace(']', '%]')
-        styled = escaped
+        styled = line
         
         # Shebang
-        styled = re.sub(shebang, lambda m: f'GRAY[{m.group(0)}]', styled)
+        styled = re.sub(shebang, lambda m: markup('GRAY', m.group(0)), styled)
         # Comments
-        styled = re.sub(comments, lambda m: f'GRAY[{m.group(0)}]', styled)
+        styled = re.sub(comments, lambda m: markup('GRAY', m.group(0)), styled)
         # Strings
-        styled = re.sub(strings, lambda m: f'GREEN[{m.group(0)}]', styled)
+        styled = re.sub(strings, lambda m: markup('GREEN', m.group(0)), styled)
         # Variables
-        styled = re.sub(variables, lambda m: f'CYAN[{m.group(0)}]', styled)
+        styled = re.sub(variables, lambda m: markup('CYAN', m.group(0)), styled)
         # Commands (at start of line)
-        styled = re.sub(commands, lambda m: f'BOLDBLUE[{m.group(0)}]', styled)
+        styled = re.sub(commands, lambda m: markup('BOLDBLUE', m.group(0)), styled)
         # Keywords
-        styled = re.sub(keywords, lambda m: f'BOLDMAGENTA[{m.group(0)}]', styled)
+        styled = re.sub(keywords, lambda m: markup('BOLDMAGENTA', m.group(0)), styled)
         # Operators
-        styled = re.sub(operators, lambda m: f'BOLDRED[{m.group(0)}]', styled)
+        styled = re.sub(operators, lambda m: markup('BOLDRED', m.group(0)), styled)
         
         styled_lines.append(styled)
     
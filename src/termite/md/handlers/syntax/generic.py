@@ -2,6 +2,8 @@
 
 import re
 
+from .markup import markup
+
 
 def highlight_generic(lines: list[str]) -> list[str]:
     """Python syntax highlighting."""
@@ -21,16 +23,13 @@ def highlight_generic(lines: list[str]) -> list[str]:
     # Comments
     comments = r'(#.*$)'
     # Function/class names (after def/class)
-    func_names = r'\b(def|class|function)\s+(\w+)'
+    func_names = r'\b(def|class|function)(\s+)(\w+)'
 
     for line in lines:
         if not line.strip():
             styled_lines.append('')
             continue
 
-        # Escape brackets first
-        escaped = line.replace('[', '%[').replace(']', '%]')
-
         # First, extract comments and replace with placeholders
         # This prevents styling content inside comments
         comment_placeholders = []
@@ -45,33 +44,33 @@ def highlight_generic(lines: list[str]) -> list[str]:
             return placeholder
 
         # Replace comments with placeholders
-        code_part = re.sub(comments, replace_comment, escaped)
+        code_part = re.sub(comments, replace_comment, line)
 
         # Now style only the code part (comments are protected)
         styled = code_part
 
         # Strings
-        styled = re.sub(strings, lambda m: f'GREEN[{m.group(0)}]', styled)
+        styled = re.sub(strings, lambda m: markup('GREEN', m.group(0)), styled)
 
         # Function/class definitions
-        styled = re.sub(func_names, lambda m: f'BOLDBLUE[{m.group(1)}] BOLDYELLOW[{m.group(2)}]', styled)
+        styled = re.sub(func_names, lambda m: f"{markup('BOLDBLUE', m.group(1))}{m.group(2)}{markup('BOLDYELLOW', m.group(3))}", styled)
 
         # Types
-        styled = re.sub(types, lambda m: f'CYAN[{m.group(0)}]', styled)
-        styled = re.sub(self, lambda m: f'CYANMAGENTA[{m.group(0)}]', styled)
+        styled = re.sub(types, lambda m: markup('CYAN', m.group(0)), styled)
+        styled = re.sub(self, lambda m: markup('CYANMAGENTA', m.group(0)), styled)
 
         # Keywords
-        styled = re.sub(keywords, lambda m: f'BOLDMAGENTA[{m.group(0)}]', styled)
+        styled = re.sub(keywords, lambda m: markup('BOLDMAGENTA', m.group(0)), styled)
 
         # Numbers
-        styled = re.sub(numbers, lambda m: f'YELLOW[{m.group(0)}]', styled)
+        styled = re.sub(numbers, lambda m: markup('YELLOW', m.group(0)), styled)
 
         # Operators
-        styled = re.sub(operators, lambda m: f'BOLDRED[{m.group(0)}]', styled)
+        styled = re.sub(operators, lambda m: markup('BOLDRED', m.group(0)), styled)
 
         # Now restore comments with their styling (GRAY only, no other styling)
         for placeholder, comment_text in comment_placeholders:
-            styled = styled.replace(placeholder, f'GRAY[{comment_text}]')
+            styled = styled.replace(placeholder, markup('GRAY', comment_text))
 
         styled_lines.append(styled)
 
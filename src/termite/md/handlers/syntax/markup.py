@@ -0,0 +1,55 @@
+"""
+Marking up the styles of highlighted code.
+
+Highlighters wrap the parts of a line to style with `markup`, and the code block handler turns the
+marks into ANSI codes with `styled_code`. The code itself never goes through sub(), which would read
+its brackets, '%', '+' and words such as RED as termite formatting.
+"""
+
+import re
+from functools import lru_cache
+
+from termite.mode import color_enabled
+from termite.raw import RESET
+from termite.sub import sub
+
+# Private-use characters marking the start of a style, the end of its name, and its end
+START = '\ue000'
+NAME_END = '\ue001'
+END = '\ue002'
+
+_MARK = re.compile(f'{START}([^{NAME_END}]*){NAME_END}|{END}')
+
+
+def markup(style: str, text: str) -> str:
+    """Style part of a line of code with a termite style, e.g. `markup('BOLDRED', '==')`."""
+    return f"{START}{style}{NAME_END}{text}{END}"
+
+
+@lru_cache(maxsize=None)
+def _codes(style: str) -> str:
+    """The ANSI codes a termite style starts with."""
+    return sub(f"{style}[{END}]").split(END)[0]
+
+
+def styled_code(line: str) -> str:
+    """The ANSI text of a line marked up with `markup`; the rest of the line is shown as it is."""
+    color = color_enabled()
+    out = []
+    styles = []
+    pos = 0
+    for m in _MARK.finditer(line):
+        out.append(line[pos:m.start()])
+        pos = m.end()
+        if m.group(1) is not None:
+            styles.append(_codes(m.group(1)) if color else '')
+            out.append(styles[-1])
+        elif styles:
+            styles.pop()
+            if color:
+                # back to the styles the closed one was nested in
+                out.append(RESET + ''.join(styles))
+    out.append(line[pos:])
+    if styles and color:
+        out.append(RESET)
+    return ''.join(out)
@@ -0,0 +1,140 @@
+"""Table handlers: GFM pipe tables drawn with box-drawing borders."""
+
+from collections import deque
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, Optional
+
+from termite.ansi import ansi_wrap, visible_width
+from termite.mode import color_enabled
+from termite.raw import (
+    RESET, BOLD, GRAY,
+    BOX_SINGLE_HORIZONTAL, BOX_SINGLE_VERTICAL, BOX_SINGLE_CROSS,
+    BOX_SINGLE_TOP_LEFT, BOX_SINGLE_TOP_RIGHT, BOX_SINGLE_BOTTOM_LEFT, BOX_SINGLE_BOTTOM_RIGHT,
+    BOX_SINGLE_VERTICAL_LEFT, BOX_SINGLE_VERTICAL_RIGHT, BOX_SINGLE_HORIZONTAL_DOWN, BOX_SINGLE_HORIZONTAL_UP,
+)
+
+# Rows used to size the columns of a table rendered as it streams in
+SAMPLE_ROWS = 100
+
+
+def fit_widths(widths: list[int], limit: int) -> list[int]:
+    """
+    Column widths for a table at most `limit` columns wide (borders included), given the widest cell
+    of each column: the widest columns are narrowed first, and their cells wrapped.
+    """
+    available = max(len(widths), limit - 3 * len(widths) - 1)
+    if sum(widths) <= available:
+        return list(widths)
+    # The largest cap c such that no column is wider than c and the columns fit
+    cap = available // len(widths)
+    for c in sorted(set(widths)):
+        if c <= cap:
+            continue
+        if sum(min(w, c) for w in widths) > available:
+            break
+        cap = c
+    fitted = [min(w, cap) for w in widths]
+    # Hand out what the cap leaves, to the widest columns first
+    spare = available - sum(fitted)
+    for i in sorted(range(len(widths)), key=lambda i: -widths[i]):
+        if spare <= 0:
+            break
+        extra = min(spare, widths[i] - fitted[i])
+        fitted[i] += extra
+        spare -= extra
+    return fitted
+
+
+class TableLayout:
+    """The column widths and alignments of a table, and how to draw its borders and rows."""
+
+    def __init__(self, widths: list[int], align: list[str]):
+        self.widths = widths
+        self.align = align
+        color = color_enabled()
+        self.border = GRAY if color else ''
+        self.header_style = BOLD if color else ''
+        self.reset = RESET if color else ''
+
+    def _rule(self, left: str, middle: str, right: str) -> str:
+        segments = (BOX_SINGLE_HORIZONTAL * (w + 2) for w in self.widths)
+        return f"{self.border}{left}{middle.join(segments)}{right}{self.reset}"
+
+    def top(self) -> str:
+        return self._rule(BOX_SINGLE_TOP_LEFT, BOX_SINGLE_HORIZONTAL_DOWN, BOX_SINGLE_TOP_RIGHT)
+
+    def separator(self) -> str:
+        return self._rule(BOX_SINGLE_VERTICAL_LEFT, BOX_SINGLE_CROSS, BOX_SINGLE_VERTICAL_RIGHT)
+
+    def bottom(self) -> str:
+        return self._rule(BOX_SINGLE_BOTTOM_LEFT, BOX_SINGLE_HORIZONTAL_UP, BOX_SINGLE_BOTTOM_RIGHT)
+
+    def row(self, cells: list[str], header: bool = False) -> list[str]:
+        """The lines of a row of styled cells (more than one if a cell is wrapped)."""
+        n = len(self.widths)
+        cells = (cells + [''] * n)[:n]
+        wrapped = [ansi_wrap(cell, w) if visible_width(cell) > w else [cell]
+                   for cell, w in zip(cells, self.widths)]
+        bar = f"{self.border}{BOX_SINGLE_VERTICAL}{self.reset}"
+        style = self.header_style if header else ''
+        reset = self.reset if style else ''
+        lines = []
+        for k in range(max(len(parts) for parts in wrapped)):
+            out = [bar]
+            for parts, w, align in zip(wrapped, self.widths, self.align):
+                text = parts[k] if k < len(parts) else ''
+                pad = w - visible_width(text)
+                if align == 'right':
+                    left = pad
+                elif align == 'center':
+                    left = pad // 2
+                else:
+                    left = 0
+                out.append(f" {' ' * left}{style}{text}{reset}{' ' * (pad - left)} {bar}")
+            lines.append(''.join(out))
+        return lines
+
+
+def table_layout(header: list[str], rows: Iterable[list[str]], align: list[str], limit: int) -> TableLayout:
+    """Size the columns of a table of styled cells to their widest cell, within `limit` columns."""
+    widths = [0] * len(align)
+    for cells in chain([header], rows):
+        for i, cell in enumerate(cells[:len(widths)]):
+            widths[i] = max(widths[i], visible_width(cell))
+    return TableLayout(fit_widths(widths, limit), align)
+
+
+def table_lines(header: list[str], rows: Iterable[list[str]], align: list[str], limit: int,
+                sample: Optional[int] = None) -> Iterator[str]:
+    """
+    Draw a table of styled cells, line by line.
+
+    Columns are sized from all the rows, or from the first `sample` rows only, so that the other rows
+    can be drawn as they are read (cells wider than their column are wrapped). Each row measured is
+    dropped once drawn, so the table is never held both as cells and as lines.
+    """
+    rows = iter(rows)
+    measured = deque(rows if sample is None else islice(rows, sample))
+    layout = table_layout(header, measured, align, limit)
+    yield layout.top()
+    yield from layout.row(header, header=True)
+    yield layout.separator()
+    while measured:
+        yield from layout.row(measured.popleft())
+    for cells in rows:
+        yield from layout.row(cells)
+    yield layout.bottom()
+
+
+def register_table_handlers(renderer):
+    """Register the table handler."""
+
+    # Tables are handled separately in the renderer, like code blocks.
+    # The handler returns final text
+    def table_handler(text: str, groups: Dict) -> str:
+        lines = text.split('\n')
+        header = renderer._table_cells(lines[0])
+        rows = (renderer._table_cells(line) for line in lines[2:])
+        return '\n'.join(table_lines(header, rows, groups['align'], renderer.terminal_width))
+
+    renderer._table_handler = table_handler
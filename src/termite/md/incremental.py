@@ -0,0 +1,117 @@
+"""
+Incremental markdown rendering for documents that keep growing (chat transcripts, logs).
+"""
+
+from typing import Dict, Optional
+
+from termite.mode import color_enabled
+from .parser import Block, split_blocks
+from .renderer import WRAPPED_KINDS, MarkdownRenderer, _render_parallel
+
+# Blocks which the lines after them can extend
+_EXTENSIBLE = ('paragraph', 'quote', 'table')
+
+
+class IncrementalRenderer(MarkdownRenderer):
+    """
+    A MarkdownRenderer whose `render` only renders the blocks that changed since the last call.
+    
+    Rendered blocks are cached by content, terminal width and color mode (paragraphs, list items and
+    quotes are cached before wrapping, and only wrapped again after a resize). When the new document
+    extends the previous one, only its last blocks are parsed again, so appending costs in proportion
+    to the new text.
+    
+    Example:
+        renderer = IncrementalRenderer()
+        for message in chat:
+            transcript += message
+            print(renderer.render(transcript))
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.clear()
+    
+    def clear(self):
+        """Forget the cached blocks (done when handlers or highlighters change)."""
+        self._markdown = ''
+        self._blocks: list[Block] = []
+        self._offsets: list[int] = []  # offset of each block in self._markdown
+        self._cache: Dict[tuple, tuple] = {}  # key -> (kind, styled text, width wrapped to, wrapped text)
+    
+    def register_handler(self, *args, **kwargs):
+        super().register_handler(*args, **kwargs)
+        self.clear()
+    
+    def unregister_handler(self, pattern: str):
+        super().unregister_handler(pattern)
+        self.clear()
+    
+    def register_syntax_highlighter(self, *args, **kwargs):
+        super().register_syntax_highlighter(*args, **kwargs)
+        self.clear()
+    
+    def _split(self, markdown: str) -> list[Block]:
+        """Split markdown into blocks, reusing those of the previous document if it is a prefix."""
+        start = 0
+        if self._blocks and markdown.startswith(self._markdown):
+            # Appending text changes the block holding the last line (often the blank one after a
+            # trailing newline), and can extend the paragraph, quote or table before it, or turn
+            # the last line of a paragraph into the header of a table
+            start = len(self._blocks) - 1
+            while start > 0 and self._blocks[start - 1].kind in _EXTENSIBLE:
+                start -= 1
+        offset = self._offsets[start] if start else 0
+        offsets = self._offsets[:start]
+        new = split_blocks(markdown[offset:])
+        for block in new:
+            offsets.append(offset)
+            offset += sum(len(line) + 1 for line in block.lines)
+        self._markdown = markdown
+        self._blocks = self._blocks[:start] + new
+        self._offsets = offsets
+        return self._blocks
+    
+    def render(self, markdown: str, workers: Optional[int] = None) -> str:
+        """
+        Render markdown text to styled terminal output, reusing the blocks rendered by previous calls.
+        
+        Args:
+            markdown: The markdown text to render
+            workers: Render the new code blocks and big headers in this many processes
+                     (see `MarkdownRenderer.render`)
+        
+        Returns:
+            Rendered styled text (ready to print)
+        """
+        width = self.terminal_width
+        color = color_enabled()
+        cache = {}
+        keys = []
+        missing = []
+        for block in self._split(markdown):
+            # Wrapped blocks are cached before wrapping, so that a resize only wraps them again
+            key = (block.text, color) if block.kind in WRAPPED_KINDS else (block.text, width, color)
+            keys.append(key)
+            if key in self._cache:
+                cache[key] = self._cache[key]
+            elif key not in cache:
+                cache[key] = None
+                missing.append((key, block))
+        if missing:
+            blocks = [block for _, block in missing]
+            styled = _render_parallel(self, blocks, workers) if workers and workers > 1 else None
+            if styled is None:
+                styled = [self._style_block(block) for block in blocks]
+            for (key, block), text in zip(missing, styled):
+                cache[key] = (block.kind, text, None, None)
+        result = []
+        for key in keys:
+            kind, styled, wrapped_width, wrapped = cache[key]
+            if wrapped_width != width:
+                wrapped = self._wrap_block(kind, styled)
+                cache[key] = (kind, styled, width, wrapped)
+            result.append(wrapped)
+        # Only keep the blocks of the current document
+        self._cache = cache
+        return '\n'.join(result)
@@ -0,0 +1,244 @@
+"""
+Full-screen pager for rendered markdown, used by `termite-md --pager`.
+
+The document is split into blocks once, as far as the view has gone; blocks are only rendered
+when they scroll into view, and their rendered lines are kept in an LRU cache. The view is anchored to a block (and a line
+within it) rather than to a line of the whole rendering, so jumping to the end of a huge document
+only renders its last page.
+"""
+
+import os
+import select
+import signal
+import sys
+from functools import lru_cache
+from typing import Optional
+
+from termite.mode import ALWAYS, NEVER, color_enabled, color_mode
+from termite.raw import RESET, REVERSE
+from termite.screen import Screen
+from .parser import Block, iter_blocks
+from .renderer import MarkdownRenderer
+
+# Rendered blocks kept in memory
+CACHE_SIZE = 512
+
+# key sequences -> action
+KEYS = {
+    'q': 'quit', 'Q': 'quit', '\x1b': 'quit', '\x03': 'quit',
+    'j': 'down', '\r': 'down', '\n': 'down', '\x0e': 'down', '\x1b[B': 'down', '\x1bOB': 'down',
+    'k': 'up', '\x10': 'up', '\x1b[A': 'up', '\x1bOA': 'up',
+    ' ': 'page_down', 'f': 'page_down', '\x06': 'page_down', '\x1b[6~': 'page_down',
+    'b': 'page_up', '\x02': 'page_up', '\x1b[5~': 'page_up',
+    'd': 'half_down', '\x04': 'half_down',
+    'u': 'half_up', '\x15': 'half_up',
+    'g': 'home', '<': 'home', '\x1b[H': 'home', '\x1b[1~': 'home', '\x1bOH': 'home',
+    'G': 'end', '>': 'end', '\x1b[F': 'end', '\x1b[4~': 'end', '\x1bOF': 'end',
+}
+
+
+class Pager:
+    """
+    Scrolls through a markdown document on a `Screen`, rendering only the blocks in view.
+
+    ```python
+    Pager(open("README.md").read(), name="README.md").run()
+    ```
+    """
+
+    def __init__(self, markdown: str, renderer: Optional[MarkdownRenderer] = None, name: str = '',
+                 file=None, cache_size: int = CACHE_SIZE):
+        self.renderer = renderer or MarkdownRenderer()
+        self.name = name
+        self.file = sys.stdout if file is None else file
+        self.blocks: list[Block] = []  # the blocks parsed so far
+        self.source_lines: list[int] = []  # first source line of each of them, for the status line
+        self.total_lines = markdown.count('\n') + 1
+        self._parse = iter_blocks(markdown)
+        self._parsed_lines = 0
+        self.screen = Screen(self.file)
+        self.top = (0, 0)  # (block, line within its rendering) shown on the first row
+        self._lines = lru_cache(maxsize=cache_size)(self._render_lines)
+        self._resized = False
+
+    @property
+    def page(self) -> int:
+        """Rows of text shown (the last row is the status line)."""
+        return max(1, self.screen.rows - 1)
+
+    def has(self, i: int) -> bool:
+        """Whether the document has a block i (parsing up to it if needed)."""
+        while len(self.blocks) <= i and self._parse is not None:
+            block = next(self._parse, None)
+            if block is None:
+                self._parse = None
+                break
+            self.blocks.append(block)
+            self.source_lines.append(self._parsed_lines)
+            self._parsed_lines += len(block.lines)
+        return i < len(self.blocks)
+
+    def _render_lines(self, i: int) -> list[str]:
+        return self.renderer._render_block(self.blocks[i]).split('\n')
+
+    def lines(self, i: int) -> list[str]:
+        """The rendered lines of block i (cached)."""
+        return self._lines(i)
+
+    def down(self, n: int):
+        """Scroll n lines down, stopping when the last line is on the last row."""
+        block, line = self.top
+        while n > 0:
+            height = len(self.lines(block))
+            if line + n < height:
+                line += n
+                break
+            if not self.has(block + 1):
+                line = height
+                break
+            n -= height - line
+            block, line = block + 1, 0
+        self.top = (block, line)
+        shown = len(self.visible())
+        if shown < self.page:
+            self.up(self.page - shown)
+
+    def up(self, n: int):
+        """Scroll n lines up, stopping at the first line."""
+        block, line = self.top
+        while n > 0:
+            if line >= n:
+                line -= n
+                break
+            if block == 0:
+                line = 0
+                break
+            n -= line
+            block -= 1
+            line = len(self.lines(block))
+        self.top = (block, line)
+
+    def home(self):
+        self.top = (0, 0)
+
+    def end(self):
+        self.has(sys.maxsize)
+        last = len(self.blocks) - 1
+        self.top = (last, len(self.lines(last)))
+        self.up(self.page)
+
+    def visible(self) -> list[str]:
+        """The lines of the page starting at the top line (fewer at the end of the document)."""
+        block, line = self.top
+        out = []
+        while len(out) < self.page and self.has(block):
+            out.extend(self.lines(block)[line:line + self.page - len(out)])
+            block, line = block + 1, 0
+        return out
+
+    def at_end(self) -> bool:
+        """Whether the last line of the document is in view."""
+        block, line = self.top
+        room = self.page
+        while self.has(block):
+            remaining = len(self.lines(block)) - line
+            if remaining > room:
+                return False
+            room -= remaining
+            block, line = block + 1, 0
+        return True
+
+    def status(self) -> str:
+        if self.at_end():
+            where = "(END)"
+        else:
+            where = f"{100 * self.source_lines[self.top[0]] // max(1, self.total_lines)}%"
+        text = f" {self.name}  {where}  q:quit  space/b:page  j/k:line  g/G:top/end "
+        reverse, reset = (REVERSE, RESET) if color_enabled() else ('', '')
+        return f"{reverse}{text[:self.screen.cols]}{reset}"
+
+    def draw(self):
+        self.screen.clear()
+        for row, line in enumerate(self.visible()):
+            self.screen.write(row, 0, line)
+        self.screen.write(self.screen.rows - 1, 0, self.status())
+        self.screen.refresh()
+
+    def resize(self):
+        """Re-render for the new terminal size, keeping the top block in view."""
+        self.screen.resize()
+        self.renderer.terminal_width = self.screen.cols
+        self._lines.cache_clear()
+        block, line = self.top
+        self.top = (block, min(line, len(self.lines(block)) - 1))
+
+    def act(self, action: str) -> bool:
+        """Apply a key's action; return False to quit."""
+        if action == 'quit':
+            return False
+        if action == 'down':
+            self.down(1)
+        elif action == 'up':
+            self.up(1)
+        elif action == 'page_down':
+            self.down(self.page)
+        elif action == 'page_up':
+            self.up(self.page)
+        elif action == 'half_down':
+            self.down(self.page // 2)
+        elif action == 'half_up':
+            self.up(self.page // 2)
+        elif action == 'home':
+            self.home()
+        elif action == 'end':
+            self.end()
+        return True
+
+    def run(self, keyboard=None):
+        """
+        Show the document until the user quits. Keys are read from `keyboard`
+        (default: the controlling terminal, so the document itself may come from stdin).
+        """
+        import termios
+        import tty
+
+        own = keyboard is None
+        keyboard = open('/dev/tty', 'rb', buffering=0) if own else keyboard
+        fd = keyboard.fileno()
+        saved = termios.tcgetattr(fd)
+
+        def on_resize(signum, frame):
+            self._resized = True
+
+        previous = signal.signal(signal.SIGWINCH, on_resize)
+        try:
+            tty.setcbreak(fd)
+            self.renderer.terminal_width = self.screen.cols
+            with color_mode(ALWAYS if color_enabled(self.file) else NEVER), self.screen:
+                self.draw()
+                while True:
+                    if self._resized:
+                        self._resized = False
+                        self.resize()
+                        self.draw()
+                    ready, _, _ = select.select([fd], [], [], 0.2)
+                    if not ready:
+                        continue
+                    keys = os.read(fd, 64).decode(errors='ignore')
+                    if not all(self.act(action) for action in _actions(keys)):
+                        break
+                    self.draw()
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            signal.signal(signal.SIGWINCH, previous)
+            if own:
+                keyboard.close()
+
+
+def _actions(keys: str) -> list[str]:
+    """The actions of what one read from the keyboard returned: a key sequence, or several typed keys."""
+    if keys in KEYS:
+        return [KEYS[keys]]
+    if keys.startswith('\x1b'):
+        return []
+    return [KEYS.get(key, '') for key in keys]
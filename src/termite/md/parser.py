@@ -0,0 +1,157 @@
+"""
+Block structure of markdown documents.
+
+`split_blocks` cuts a document into code blocks, tables, headers, rules, quotes, list items,
+paragraphs and blank lines in a single pass. Each line is classified once, by looking up
+its first character, so only the patterns which can match it are tried.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Iterator
+
+# Line-level patterns, also used to register the default block handlers
+HEADER_PATTERN = r'^(?P<level>#{1,6})\s+(?P<text>.*)$'
+HR_PATTERN = r'^[\-\*]{3,}$'
+QUOTE_PATTERN = r'^>(?:\s+|$)(?P<text>.*?)$'
+BULLET_PATTERN = r'^[\-\*]\s+(?P<text>.*?)$'
+ORDERED_PATTERN = r'^(?P<num>\d+)\.\s+(?P<text>.*?)$'
+
+BLOCK_PATTERNS = {
+    'header': HEADER_PATTERN,
+    'hr': HR_PATTERN,
+    'quote': QUOTE_PATTERN,
+    'bullet': BULLET_PATTERN,
+    'ordered': ORDERED_PATTERN,
+}
+
+# Delimiter row of a (GFM) table, under its header row: | --- | :---: | ---: |
+TABLE_DELIMITER_PATTERN = r'^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$'
+_table_delimiter = re.compile(TABLE_DELIMITER_PATTERN)
+_cell_separator = re.compile(r'(?<!\\)\|')
+
+_compiled = {kind: re.compile(pattern) for kind, pattern in BLOCK_PATTERNS.items()}
+
+# first character of a line -> the kinds of block it can start, in the order they are tried
+_DISPATCH = {
+    '#': ('header',),
+    '>': ('quote',),
+    '-': ('hr', 'bullet'),
+    '*': ('hr', 'bullet'),
+    **{digit: ('ordered',) for digit in '0123456789'},
+}
+
+
+@dataclass
+class Block:
+    """
+    A block of a markdown document.
+
+    kind is one of 'code', 'table', 'header', 'hr', 'quote', 'bullet', 'ordered', 'paragraph' or 'blank'.
+    groups holds the named groups of the line pattern (for code blocks: 'lang' and 'text';
+    for tables: 'align', the alignment of each column; for quotes: 'text', the content of all the lines).
+    """
+    kind: str
+    lines: list[str]
+    groups: dict = field(default_factory=dict)
+
+    @cached_property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+
+def classify(line: str) -> tuple[str, dict]:
+    """Return the kind of block `line` belongs to (see `Block`), and the named groups of its pattern."""
+    for kind in _DISPATCH.get(line[:1], ()):
+        match = _compiled[kind].match(line)
+        if match:
+            return kind, match.groupdict()
+    return ('paragraph' if line else 'blank'), {}
+
+
+def is_fence(line: str) -> bool:
+    return line.lstrip().startswith('```')
+
+
+def split_row(line: str) -> list[str]:
+    """The cells of a table row, stripped, with escaped pipes (\\|) unescaped."""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [cell.strip().replace('\\|', '|') for cell in _cell_separator.split(line)]
+
+
+def table_alignment(delimiter: str) -> list[str]:
+    """The alignment ('left', 'center' or 'right') of each column, from the delimiter row of a table."""
+    align = []
+    for cell in split_row(delimiter):
+        if cell.endswith(':'):
+            align.append('center' if cell.startswith(':') else 'right')
+        else:
+            align.append('left')
+    return align
+
+
+def is_table_start(lines: list[str], i: int) -> bool:
+    """Whether lines[i] is the header row of a table: followed by a delimiter row with as many cells."""
+    return ('|' in lines[i] and i + 1 < len(lines) and _table_delimiter.match(lines[i + 1]) is not None
+            and len(split_row(lines[i])) == len(split_row(lines[i + 1])))
+
+
+def is_table_row(line: str) -> bool:
+    return '|' in line and bool(line.strip()) and not is_fence(line)
+
+
+def split_blocks(markdown: str) -> list[Block]:
+    """Split markdown into blocks. Consecutive quote lines and consecutive paragraph lines are grouped."""
+    return list(iter_blocks(markdown))
+
+
+def iter_blocks(markdown: str) -> Iterator[Block]:
+    """The blocks of `split_blocks`, parsed as they are needed."""
+    lines = markdown.split('\n')
+    i = 0
+    n = len(lines)
+    pending = None  # classification of lines[i], if already done
+    while i < n:
+        line = lines[i]
+        if is_fence(line):
+            lang = line.strip()[3:].strip()
+            j = i + 1
+            while j < n and not is_fence(lines[j]):
+                j += 1
+            code = lines[i + 1:j]
+            yield Block('code', lines[i:j + 1], {'lang': lang, 'text': '\n'.join(code)})
+            i = j + 1
+            continue
+        if pending is None and is_table_start(lines, i):
+            j = i + 2
+            while j < n and is_table_row(lines[j]):
+                j += 1
+            yield Block('table', lines[i:j], {'align': table_alignment(lines[i + 1])})
+            i = j
+            continue
+        kind, groups = pending or classify(line)
+        pending = None
+        j = i + 1
+        if kind == 'quote':
+            texts = [groups['text']]
+            while j < n and lines[j][:1] == '>':
+                match = _compiled['quote'].match(lines[j])
+                if not match:
+                    break
+                texts.append(match.group('text'))
+                j += 1
+            groups = {'text': '\n'.join(texts)}
+        elif kind == 'paragraph':
+            while j < n and not is_fence(lines[j]) and not is_table_start(lines, j):
+                pending = classify(lines[j])
+                if pending[0] != 'paragraph':
+                    break
+                pending = None
+                j += 1
+        yield Block(kind, lines[i:j], groups)
+        i = j
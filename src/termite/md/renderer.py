@@ -5,9 +5,18 @@ This module provides the main MarkdownRenderer class that processes markdown
 and applies termite styling for colors, formatting, and syntax highlighting.
 """
 
+import multiprocessing
 import re
 import shutil
-from typing import Callable, Dict, Optional
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from termite.ansi import TEXT, ansi_slice, ansi_wrap, text_width, tokenize, visible_width
+from termite.sub import sub
+from termite.mode import ALWAYS, NEVER, color_enabled, color_mode
+from termite.terminal import StreamState, cprint
 
 from .handlers import (
     register_header_handlers,
@@ -16,8 +25,30 @@ from .handlers import (
     register_link_handlers,
     register_list_handlers,
     register_block_handlers,
+    register_table_handlers,
 )
 from .handlers.syntax import highlight_python, highlight_bash, highlight_generic
+from .handlers.tables import SAMPLE_ROWS, TableLayout, table_layout
+from .parser import BLOCK_PATTERNS, Block, is_fence, is_table_row, split_blocks, split_row
+
+_FLAGS = re.MULTILINE | re.DOTALL
+
+# Blocks wrapped to the terminal width, and what their continuation lines are indented by:
+# the list marker or quote bar (and the spaces after it), or a paragraph line's leading spaces
+WRAPPED_KINDS = {'paragraph', 'bullet', 'ordered', 'quote'}
+_MARKER = re.compile(r'\s*\S+\s+')
+_LEADING_SPACE = re.compile(r'\s*')
+
+# Built-in inline patterns, tried first and in this order: more specific patterns first
+INLINE_PATTERNS = [
+    r'!\[(?P<alt>.*?)\]\((?P<url>.*?)\)',
+    r'\[(?P<text>.*?)\]\((?P<url>.*?)\)',
+    r'`(?P<text>[^`]+?)`',
+    r'\*\*(?P<text>.*?)\*\*',
+    r'__(?P<text>.*?)__',
+    r'(?<!\*)\*(?P<text>[^*]+?)\*(?!\*)',
+    r'(?<!_)_(?P<text>[^_]+?)_(?!_)',
+]
 
 
 class MarkdownRenderer:
@@ -30,7 +61,12 @@ class MarkdownRenderer:
     
     def __init__(self):
         self.handlers: Dict[str, Callable[[str, Dict], str]] = {}
+        self._patterns: Dict[str, re.Pattern] = {}
+        self._flat: set[str] = set()  # patterns whose text group is not rendered first
+        self._final: set[str] = set()  # patterns whose handler returns final text, not termite formatting
+        self._inline = None  # combined inline regex, built on first use
         self._code_block_handler: Optional[Callable[[str, Dict], str]] = None
+        self._table_handler: Optional[Callable[[str, Dict], str]] = None
         self._syntax_highlighters: Dict[str, Callable[[list[str]], list[str]]] = {}
         # Get terminal width
         try:
@@ -42,7 +78,8 @@ class MarkdownRenderer:
         self._register_default_handlers()
         self._register_default_syntax_highlighters()
     
-    def register_handler(self, pattern: str, handler: Callable[[str, Dict], str]):
+    def register_handler(self, pattern: str, handler: Callable[[str, Dict], str], nested: bool = True,
+                         final: bool = False):
         """
         Register a custom handler for a markdown pattern.
         
@@ -50,6 +87,13 @@ class MarkdownRenderer:
             pattern: A regex pattern to match (should include capturing groups)
             handler: A function that takes (match_text, groups_dict) and returns termite formatting string
                     groups_dict contains named groups from the regex pattern
+            nested: Render markdown within the `text` group before passing it to the handler
+                    (False for e.g. code spans)
+            final: The handler returns final styled text (ANSI codes), not termite formatting strings.
+                   Only for line-level patterns (headers, lists...), whose output makes up the whole block.
+        
+        Raises:
+            re.error: If the pattern is not a valid regex
         
         Example:
             renderer.register_handler(
@@ -57,7 +101,25 @@ class MarkdownRenderer:
                 lambda text, groups: f"STRIKETHROUGH[{groups['text']}]"
             )
         """
+        self._patterns[pattern] = re.compile(pattern, _FLAGS)
         self.handlers[pattern] = handler
+        if nested:
+            self._flat.discard(pattern)
+        else:
+            self._flat.add(pattern)
+        if final:
+            self._final.add(pattern)
+        else:
+            self._final.discard(pattern)
+        self._inline = None
+    
+    def unregister_handler(self, pattern: str):
+        """Remove the handler registered for a pattern, if any."""
+        self.handlers.pop(pattern, None)
+        self._patterns.pop(pattern, None)
+        self._flat.discard(pattern)
+        self._final.discard(pattern)
+        self._inline = None
     
     def register_syntax_highlighter(self, language: str, highlighter: Callable[[list[str]], list[str]]):
         """
@@ -66,7 +128,8 @@ class MarkdownRenderer:
         Args:
             language: Language name (e.g., 'python', 'bash', 'javascript')
             highlighter: Function that takes a list of code lines and returns a list of styled lines
-                        Each line should be a termite formatting string
+                        Each line is the code, with the parts to style wrapped with `markup(style, text)`
+                        (style being a termite style such as 'BOLDRED')
         
         Example:
             def highlight_python(lines):
@@ -85,6 +148,7 @@ class MarkdownRenderer:
         register_link_handlers(self)
         register_list_handlers(self)
         register_block_handlers(self)
+        register_table_handlers(self)
     
     def _register_default_syntax_highlighters(self):
         """Register default syntax highlighters for common languages."""
@@ -104,180 +168,331 @@ class MarkdownRenderer:
         elif self._default_highlighter:
             return self._default_highlighter(lines)
         else:
-            # No highlighting, just escape brackets
-            return [line.replace('[', '%[').replace(']', '%]') for line in lines]
+            # No highlighting
+            return lines
     
-    def render(self, markdown: str) -> str:
+    def render(self, markdown: str, workers: Optional[int] = None) -> str:
         """
         Render markdown text to styled terminal output using termite.
         
         Args:
             markdown: The markdown text to render
+            workers: Render code blocks and big (h1) headers in this many processes, for large documents.
+                     Needs the fork start method (Linux); rendering stays in this process elsewhere.
         
         Returns:
             Rendered styled text (ready to print, already processed through sub())
         """
-        lines = markdown.split('\n')
-        result_lines = []
-        in_code_block = False
-        code_block_content = []
-        code_block_lang = ''
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            # Handle code blocks (multiline)
-            if line.strip().startswith('```'):
-                if not in_code_block:
-                    # Start of code block
-                    in_code_block = True
-                    code_block_lang = line.strip()[3:].strip()
-                    code_block_content = []
-                else:
-                    # End of code block
-                    in_code_block = False
-                    code_text = '\n'.join(code_block_content)
-                    # Manually call code block handler
-                    groups = {'text': code_text, 'lang': code_block_lang}
-                    rendered = self._code_block_handler(f"```{code_block_lang}\n{code_text}```", groups)
-                    result_lines.append(rendered)
-                    code_block_content = []
-                i += 1
-                continue
-            
-            if in_code_block:
-                code_block_content.append(line)
-                i += 1
-                continue
-            
-            # Process line with handlers
-            # Apply handlers in order: headers first (line-level), then inline elements
-            processed_line = line
-            
-            # Headers should be processed first as they're line-level patterns
-            header_pattern = r'^(?P<level>#{1,6})\s+(?P<text>.*)$'
-            header_match = re.match(header_pattern, processed_line)
-            if header_match:
-                header_handler = self.handlers.get(header_pattern)
-                if header_handler:
-                    groups = header_match.groupdict()
-                    processed_line = header_handler(header_match.group(0), groups)
-                    result_lines.append(processed_line)
-                    i += 1
-                    continue
-            
-            # Order matters: apply more specific patterns first for inline elements
-            # Define priority order for built-in handlers
-            priority_patterns = [
-                r'!\[(?P<alt>.*?)\]\((?P<url>.*?)\)',
-                r'\[(?P<text>.*?)\]\((?P<url>.*?)\)',
-                r'`(?P<text>[^`]+?)`',
-                r'\*\*(?P<text>.*?)\*\*',
-                r'__(?P<text>.*?)__',
-                r'(?<!\*)\*(?P<text>[^*]+?)\*(?!\*)',
-                r'(?<!_)_(?P<text>[^_]+?)_(?!_)',
-            ]
-            
-            # Apply priority handlers first
-            for pattern in priority_patterns:
-                handler = self.handlers.get(pattern)
-                if handler:
-                    processed_line = self._apply_handler(processed_line, pattern, handler)
-            
-            # Apply all other handlers (including custom ones, but skip headers)
-            for pattern, handler in self.handlers.items():
-                if pattern not in priority_patterns and pattern != header_pattern:
-                    processed_line = self._apply_handler(processed_line, pattern, handler)
-            
-            result_lines.append(processed_line)
-            i += 1
-        
-        # Join all lines
-        result_text = '\n'.join(result_lines)
-        
-        # Handle special header markers before sub() processing
-        # This avoids sub() duplication issues with certain text patterns
-        from termite.fancy import t
-        from termite.raw import RESET, BG_GRAY
-        
-        # Replace dashes first (before closing markers) - use regex to match the pattern
-        # Pattern: __UNDERLINE__<dashes>__END__
-        def replace_underline(match):
-            dashes = match.group(1)
-            return str(t.GRAY) + dashes + str(RESET)
-        
-        result_text = re.sub(r'__UNDERLINE__([─]+)__END__', replace_underline, result_text)
+        return self.render_blocks(split_blocks(markdown), workers)
+    
+    def render_blocks(self, blocks: list[Block], workers: Optional[int] = None) -> str:
+        """Render blocks (see `split_blocks`) to styled terminal output, one line apart."""
+        if workers and workers > 1:
+            styled = _render_parallel(self, blocks, workers)
+            if styled is not None:
+                return '\n'.join(self._wrap_block(block.kind, text) for block, text in zip(blocks, styled))
+        return '\n'.join(self._render_block(block) for block in blocks)
+    
+    def render_stream(self, chunks: Iterable[str], file=None, max_fps: float = 30,
+                      table_sample: int = SAMPLE_ROWS) -> str:
+        """
+        Render markdown arriving in chunks (e.g. tokens from a model) to a file as it comes.
         
-        # Replace header markers (before replacing closing __END__)
-        result_text = result_text.replace('__HEADER_H2__', str(t.BOLD + t.BLACK))
-        result_text = result_text.replace('__HEADER_H3__', str(t.BOLD + t.GRAY))
-        result_text = result_text.replace('__HEADER_H4__', str(t.BOLD + t.LIGHT_GRAY))
-        result_text = result_text.replace('__HEADER_H5__', str(t.BOLD + t.BRIGHT_BLACK))
-        result_text = result_text.replace('__HEADER_H6__', str(t.BOLD + t.WHITE))
+        Each block is written as soon as it is complete. On a terminal, the block still being
+        written is redrawn in place as it grows, at most max_fps times per second.
+        Tables are written row by row once they have table_sample rows, with columns sized from those rows.
         
-        # Replace closing markers
-        result_text = result_text.replace('__END__', str(RESET))
+        Args:
+            chunks: The markdown text, in pieces of any size
+            file: Where to write (default: stdout)
+            max_fps: Maximum redraws per second of the incomplete block
+            table_sample: Number of rows which size the columns of a table being streamed
         
-        # Process through sub() to convert termite formatting strings to actual ANSI codes
-        # Lazy import to avoid circular dependency
-        from termite.sub import sub
-        processed = sub(result_text)
+        Returns:
+            The whole rendered text, as `render` would return it (except for the column widths of long tables)
+        """
+        file = sys.stdout if file is None else file
+        try:
+            live = file.isatty()
+        except (AttributeError, ValueError):
+            live = False
+        rows = shutil.get_terminal_size().lines
+        interval = 1 / max_fps if max_fps else 0
+        state = StreamState()
+        last = float('-inf')
+        pending = ''
+        written = []
+        table: Optional[TableLayout] = None  # layout of the table being written row by row
         
-        # Fix RESET codes in code blocks - they break the background color
-        # We need to reapply background after RESET within code block lines
-        # Code block lines have BGGRAYGRAY[│] prefix, so we can detect them
-        from termite.raw import BG_GRAY
+        def clear():
+            # Erase the drawing of the incomplete block, leaving the cursor where it started
+            if state.get('frame'):
+                cprint('', file=file, state=state, diff=True)
+                state.clear()
         
-        # Pattern to match code block lines: BGGRAYGRAY[│] followed by content
-        # After sub(), this becomes ANSI codes, so we look for the border char │
-        # and then replace RESET with RESET+BG_GRAY to maintain background
-        lines = processed.split('\n')
-        fixed_lines = []
-        in_code_block = False
+        def write(text):
+            clear()
+            file.write(text)
+            file.flush()
+            written.append(text)
         
-        for line in lines:
-            # Detect code block lines by looking for the border character
-            if '│' in line and BG_GRAY in line[:50]:  # Check if it's a code block line
-                in_code_block = True
-                # Replace RESET with RESET+BG_GRAY to maintain background
-                # But we need to be careful - only replace RESET that's not at the end
-                # Actually, we want to replace all RESET except the final one
-                if RESET in line:
-                    # Split by RESET, then rejoin with RESET+BG_GRAY except for the last segment
-                    parts = line.split(RESET)
-                    if len(parts) > 1:
-                        # Rejoin all but the last with RESET+BG_GRAY
-                        fixed = (RESET + BG_GRAY).join(parts[:-1]) + RESET + parts[-1]
-                        # But we need to ensure the line ends with RESET to close properly
-                        if not fixed.endswith(RESET):
-                            fixed = fixed + RESET
-                        line = fixed
-            else:
-                in_code_block = False
-            
-            fixed_lines.append(line)
+        def table_rows(lines):
+            # Draw the leading table rows of lines; return how many there were
+            count = 0
+            out = []
+            for line in lines:
+                if not is_table_row(line):
+                    break
+                out += table.row(self._table_cells(line))
+                count += 1
+            if out:
+                write('\n'.join(out) + '\n')
+            return count
         
-        return '\n'.join(fixed_lines)
+        with color_mode(ALWAYS if color_enabled(file) else NEVER):
+            for chunk in chunks:
+                pending += chunk
+                cut = pending.rfind('\n')
+                if cut >= 0 and table is not None:
+                    lines = pending[:cut].split('\n')
+                    count = table_rows(lines)
+                    pending = pending.split('\n', count)[-1]
+                    if count < len(lines):
+                        write(table.bottom() + '\n')
+                        table = None
+                    cut = pending.rfind('\n')
+                if cut >= 0:
+                    # Only whole lines are split; every block but the last is complete
+                    blocks = split_blocks(pending[:cut])
+                    done = len(blocks) if _closed(blocks[-1]) else len(blocks) - 1
+                    if done:
+                        write(self.render_blocks(blocks[:done]) + '\n')
+                        pending = pending.split('\n', sum(len(b.lines) for b in blocks[:done]))[-1]
+                    block = blocks[-1]
+                    if done < len(blocks) and block.kind == 'table' and len(block.lines) - 2 >= table_sample:
+                        # A long table: size its columns now, then write its rows as they come
+                        sample = [self._table_cells(line) for line in block.lines[2:]]
+                        header = self._table_cells(block.lines[0])
+                        table = table_layout(header, sample, block.groups['align'], self.terminal_width)
+                        lines = [table.top(), *table.row(header, header=True), table.separator()]
+                        write('\n'.join(lines + [line for cells in sample for line in table.row(cells)]) + '\n')
+                        pending = pending.split('\n', len(block.lines))[-1]
+                if live and pending and table is None and time.monotonic() - last >= interval:
+                    lines = ansi_wrap(self.render(pending), self.terminal_width)
+                    cprint('\n'.join(lines[-(rows - 1):]), file=file, state=state, diff=True)
+                    last = time.monotonic()
+            clear()
+            if table is not None:
+                lines = pending.split('\n')
+                count = table_rows(lines)
+                pending = '\n'.join(lines[count:])
+                write(table.bottom() + ('\n' if pending else ''))
+            text = self.render(pending) if pending else ''
+            write(text)
+        return ''.join(written)
     
-    def _apply_handler(self, text: str, pattern: str, handler: Optional[Callable] = None) -> str:
-        """Apply a handler to matching patterns in text."""
-        if handler is None:
-            handler = self.handlers.get(pattern)
-            if handler is None:
-                return text
-        
-        def replace_func(match):
-            groups = match.groupdict() if match.groupdict() else {}
+    def _inline_regex(self):
+        """
+        The inline handlers (built-in ones first, in priority order, then custom ones) as one alternation,
+        each pattern wrapped in a group named h<i>, with its own groups renamed h<i>_<name>.
+        Returns (regex or None, {wrapper group name: (handler, group number of the wrapper,
+        {group name: number within the pattern}, number of groups in the pattern, nested)}).
+        """
+        if self._inline is None:
+            block_patterns = set(BLOCK_PATTERNS.values())
+            order = [p for p in INLINE_PATTERNS if p in self.handlers]
+            order += [p for p in self.handlers if p not in INLINE_PATTERNS and p not in block_patterns]
+            if not order:
+                self._inline = (None, {})
+                return self._inline
+            combined = '|'.join(f"(?P<h{i}>{_scoped(pattern, f'h{i}_')})" for i, pattern in enumerate(order))
+            firsts = {_first_literal(pattern) for pattern in order}
+            if None not in firsts:
+                # Lets the regex engine skip positions where no handler can match
+                combined = f"(?=[{re.escape(''.join(sorted(firsts)))}])(?:{combined})"
+            regex = re.compile(combined, _FLAGS)
+            entries = {}
+            for i, pattern in enumerate(order):
+                compiled = self._patterns[pattern]
+                entries[f'h{i}'] = (self.handlers[pattern], regex.groupindex[f'h{i}'],
+                                    compiled.groupindex.items(), compiled.groups, pattern not in self._flat)
+            self._inline = (regex, entries)
+        return self._inline
+    
+    def _render_inline(self, text: str) -> str:
+        """Apply the inline handlers to text, in a single pass."""
+        regex, entries = self._inline_regex()
+        if regex is None:
+            return text
+        out = []
+        pos = 0
+        for match in regex.finditer(text):
+            handler, start, names, count, nested = entries[match.lastgroup]
+            groups = {name: match.group(start + index) for name, index in names}
             # Also add numbered groups
-            for i, group in enumerate(match.groups(), 1):
-                if f'group{i}' not in groups:
-                    groups[f'group{i}'] = group
-            return handler(match.group(0), groups)
-        
-        try:
-            return re.sub(pattern, replace_func, text, flags=re.MULTILINE | re.DOTALL)
-        except Exception:
-            # If pattern fails, return original text
+            for i in range(1, count + 1):
+                groups.setdefault(f'group{i}', match.group(start + i))
+            if nested and groups.get('text'):
+                groups['text'] = self._render_inline(groups['text'])
+            out.append(text[pos:match.start()])
+            out.append(handler(match.group(0), groups))
+            pos = match.end()
+        if not pos:
             return text
+        out.append(text[pos:])
+        return ''.join(out)
+    
+    def _table_cells(self, line: str) -> list[str]:
+        """The cells of a table row, rendered to styled text."""
+        return [sub(self._render_inline(cell)) if cell else cell for cell in split_row(line)]
+    
+    def _render_block(self, block: Block) -> str:
+        """Render one block to its final styled text, wrapped to the terminal width."""
+        return self._wrap_block(block.kind, self._style_block(block))
+    
+    def _wrap_block(self, kind: str, styled: str) -> str:
+        """Wrap a styled paragraph, list item or quote to the terminal width; other blocks fit already."""
+        return wrap_lines(styled, self.terminal_width, kind) if kind in WRAPPED_KINDS else styled
+    
+    def _style_block(self, block: Block) -> str:
+        """Render one block to styled text, not wrapped."""
+        kind = block.kind
+        if kind == 'code':
+            lang, code = block.groups['lang'], block.groups['text']
+            return self._code_block_handler(f"```{lang}\n{code}```", {'text': code, 'lang': lang})
+        if kind == 'table':
+            return self._table_handler(block.text, dict(block.groups))
+        pattern = BLOCK_PATTERNS.get(kind)
+        handler = self.handlers.get(pattern)
+        if handler is None:
+            # Paragraphs, blank lines, and blocks whose handler was removed
+            markup = '\n'.join(self._render_inline(line) for line in block.lines)
+        elif kind == 'header':
+            markup = handler(block.text, dict(block.groups))
+        else:
+            groups = dict(block.groups)
+            if 'text' in groups:
+                groups['text'] = '\n'.join(self._render_inline(line) for line in groups['text'].split('\n'))
+            markup = handler(block.text, groups)
+        if pattern in self._final:
+            return markup
+        # Convert termite formatting strings to ANSI codes, once per block
+        return sub(markup) if markup else markup
+
+
+# (renderer, blocks, colors on) of the parallel render a worker process is part of. Workers are forked,
+# so they get it from the pool's initializer without pickling the renderer and its handlers
+_parallel_job = None
+
+
+def _init_worker(job: tuple):
+    global _parallel_job
+    _parallel_job = job
+
+
+def _heavy(block: Block) -> bool:
+    """Whether a block is worth rendering in another process: code (highlighting, box) or big text."""
+    return block.kind == 'code' or (block.kind == 'header' and block.groups.get('level') == '#')
+
+
+def _render_batch(indices: list[int]) -> list[str]:
+    renderer, blocks, color = _parallel_job
+    with color_mode(ALWAYS if color else NEVER):
+        return [renderer._style_block(blocks[i]) for i in indices]
 
+
+def _render_parallel(renderer: MarkdownRenderer, blocks: list[Block], workers: int) -> Optional[list[str]]:
+    """
+    Style the heavy blocks in a pool of forked processes while this one styles the others (see `_style_block`).
+    Returns None when that isn't possible or worth it.
+    """
+    heavy = [i for i, block in enumerate(blocks) if _heavy(block)]
+    if len(heavy) < workers or 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    # A few batches per worker, to balance the load while keeping the messages few
+    size = -(-len(heavy) // (workers * 4))
+    batches = [heavy[i:i + size] for i in range(0, len(heavy), size)]
+    rendered: list = [None] * len(blocks)
+    job = (renderer, blocks, color_enabled())
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'),
+                             initializer=_init_worker, initargs=(job,)) as pool:
+        futures = [pool.submit(_render_batch, batch) for batch in batches]
+        for i, block in enumerate(blocks):
+            if not _heavy(block):
+                rendered[i] = renderer._style_block(block)
+        for batch, future in zip(batches, futures):
+            for i, text in zip(batch, future.result()):
+                rendered[i] = text
+    return rendered
+
+
+def wrap_lines(text: str, width: int, kind: str = 'paragraph') -> str:
+    """
+    Wrap the lines of a styled block wider than `width` visible columns, keeping hanging indents:
+    continuation lines start under the text of a list item (after its marker), under the indentation
+    of a paragraph line, or after a repeat of the bar of a quote line.
+    """
+    out = []
+    for line in text.split('\n'):
+        if visible_width(line) <= width:
+            out.append(line)
+            continue
+        plain = ''.join(line[start:end] for token, start, end in tokenize(line) if token is TEXT)
+        match = (_LEADING_SPACE if kind == 'paragraph' else _MARKER).match(plain)
+        indent = text_width(match.group(0)) if match else 0
+        if indent * 2 > width:
+            # too narrow to keep the indent
+            indent = 0
+        head = ansi_slice(line, 0, indent) if indent else ''
+        lead = head if kind == 'quote' else ' ' * indent
+        parts = ansi_wrap(ansi_slice(line, indent), width - indent)
+        out.append(head + parts[0])
+        out.extend(lead + part for part in parts[1:])
+    return '\n'.join(out)
+
+
+def _closed(block: Block) -> bool:
+    """Whether `block` is complete, i.e. appending lines to the document can't change it anymore."""
+    if block.kind == 'code':
+        return len(block.lines) > 1 and is_fence(block.lines[-1])
+    return block.kind not in ('paragraph', 'quote', 'table')
+
+
+_LOOKAROUND = re.compile(r'\(\?<?[!=](?:\\.|[^()\\])*\)')
+_GLOBAL_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+_GROUP_NAME = re.compile(r'(?<!\\)\(\?P(<|=)(\w+)([>)])')
+
+
+def _scoped(pattern: str, prefix: str) -> str:
+    """Make a pattern embeddable in a larger one: prefix its group names, and scope its leading flags."""
+    pattern = _GROUP_NAME.sub(lambda m: f'(?P{m.group(1)}{prefix}{m.group(2)}{m.group(3)}', pattern)
+    flags = _GLOBAL_FLAGS.match(pattern)
+    if flags:
+        pattern = f'(?{flags.group(1)}:{pattern[flags.end():]})'
+    return pattern
+
+
+def _first_literal(pattern: str) -> Optional[str]:
+    """
+    The character every match of a pattern starts with, if the pattern starts with a plain
+    (or escaped) literal, after anchors and lookarounds. None if it can't be told.
+    """
+    if '|' in pattern:
+        return None
+    p = pattern.lstrip('^')
+    while p.startswith(('(?<!', '(?<=', '(?!', '(?=')):
+        end = _LOOKAROUND.match(p)
+        if end is None:
+            return None
+        p = p[end.end():]
+    if p[:1] == '\\':
+        char, rest = p[1:2], p[2:]
+        if not char or char.isalnum():
+            return None
+    else:
+        char, rest = p[:1], p[1:]
+        if not char or char in '.^$*+?{}[]()':
+            return None
+    if rest[:1] in ('*', '?', '{'):
+        return None
+    return char
@@ -0,0 +1,77 @@
+"""
+Color mode: whether termite emits colors and styles at all.
+
+- "always": always emit them
+- "never": produce plain text (no SGR codes are built in the first place)
+- "auto" (default): never if $NO_COLOR is set, always if $FORCE_COLOR is set, otherwise only when writing to a TTY
+
+The mode can be set globally (`set_color_mode`, or $TERMITE_COLOR) or for a block of code (`with color_mode("never"):`).
+"""
+import os
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Literal
+
+AUTO = "auto"
+ALWAYS = "always"
+NEVER = "never"
+MODES = (AUTO, ALWAYS, NEVER)
+
+ColorMode = Literal["auto", "always", "never"]
+
+settings = {
+    "color": os.environ.get("TERMITE_COLOR", AUTO)
+}
+
+_context_mode: ContextVar[str | None] = ContextVar("termite_color_mode", default=None)
+_last_tty = [None, False]  # (file, isatty) of the last stream checked
+
+
+def _check(mode: str) -> str:
+    if mode not in MODES:
+        raise ValueError(f"invalid color mode {mode!r}, expected one of {MODES}")
+    return mode
+
+
+def set_color_mode(mode: ColorMode):
+    settings["color"] = _check(mode)
+
+
+def get_color_mode() -> str:
+    return _context_mode.get() or settings["color"]
+
+
+@contextmanager
+def color_mode(mode: ColorMode):
+    """Use another color mode within a `with` block (per thread / asyncio task)."""
+    token = _context_mode.set(_check(mode))
+    try:
+        yield
+    finally:
+        _context_mode.reset(token)
+
+
+def _isatty(file) -> bool:
+    if _last_tty[0] is file:
+        return _last_tty[1]
+    try:
+        tty = file.isatty()
+    except (AttributeError, ValueError):
+        tty = False
+    _last_tty[:] = file, tty
+    return tty
+
+
+def color_enabled(file=None) -> bool:
+    """Whether colors should be emitted for `file` (stdout by default)."""
+    mode = _context_mode.get() or settings["color"]
+    if mode == ALWAYS:
+        return True
+    if mode == NEVER:
+        return False
+    if os.environ.get("NO_COLOR"):
+        return False
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    return _isatty(sys.stdout if file is None else file)
@@ -0,0 +1,112 @@
+import sys
+from functools import lru_cache
+
+from termite.raw import RESET, L_1_8, L_2_8, L_3_8, L_4_8, L_5_8, L_6_8, L_7_8, B_FULL, BRAILLE_FULL
+from termite.raw.braille import braille
+from termite.terminal import cprint, global_state, stream_state
+
+# partial cells of each style, from empty to full
+BAR_STYLES = {
+    "blocks": (" ", L_1_8, L_2_8, L_3_8, L_4_8, L_5_8, L_6_8, L_7_8, B_FULL),
+    # braille fills dot by dot, the left column bottom up, then the right one
+    "braille": tuple(braille([7, 3, 2, 1, 8, 6, 5, 4][:n]) for n in range(8)) + (BRAILLE_FULL,),
+    "ascii": (" ", "-", "=", "#"),
+}
+
+
+@lru_cache(maxsize=None)
+def bar_strings(width: int, style: str = "blocks") -> tuple[str, ...]:
+    """Every bar `width` cells wide in `style`, from empty to full, one per sub-cell step."""
+    cells = BAR_STYLES[style]
+    res = len(cells) - 1
+    full, empty = cells[-1], cells[0]
+    bars = []
+    for n in range(width * res + 1):
+        whole, part = divmod(n, res)
+        bar = full * whole
+        if whole < width:
+            bar += cells[part] + empty * (width - whole - 1)
+        bars.append(bar)
+    return tuple(bars)
+
+
+class ProgressBar:
+    """
+    A progress bar line drawn with `cprint`, with sub-cell resolution.
+
+    Bars are precomputed for the width and style, so an update is a few integer operations,
+    and an update which doesn't change what is shown writes nothing.
+
+    ```python
+    with ProgressBar(total=len(items), label="loading") as bar:
+        for item in items:
+            ...
+            bar.advance()
+    ```
+    """
+
+    def __init__(self,
+                 total: float = 100,
+                 width: int = 40,
+                 style: str = "blocks",
+                 label: str = "",
+                 color: str = "",  # SGR codes for the bar, e.g. t.GREEN
+                 file=sys.stdout,
+                 state: dict | None = global_state,
+                 **kw,  # passed to cprint
+                 ):
+        self.total = total
+        self.n = 0
+        self.label = label
+        self.color = color
+        self.file = file
+        self.state = state
+        self.kw = kw
+        self.bars = bar_strings(width, style)
+        self.steps = len(self.bars) - 1
+        self._shown = None  # (step, percent) currently on screen
+        self.update(0)
+
+    def update(self, n: float) -> bool:
+        """Set the progress to `n` out of `total`. Returns True if anything was redrawn."""
+        self.n = n
+        total = self.total
+        if n >= total:
+            step, percent = self.steps, 100
+        elif n <= 0 or not total:
+            step, percent = 0, 0
+        else:
+            step = int(n * self.steps // total)
+            percent = int(n * 100 // total)
+        if (step, percent) == self._shown:
+            return False
+        self._shown = (step, percent)
+        self.draw()
+        return True
+
+    def advance(self, k: float = 1) -> bool:
+        return self.update(self.n + k)
+
+    def render(self) -> str:
+        step, percent = self._shown
+        bar = self.bars[step]
+        if self.color:
+            bar = self.color + bar + RESET
+        label = f"{self.label} " if self.label else ""
+        return f"{label}{bar} {percent:>3}%"
+
+    def draw(self):
+        cprint(self.render(), file=self.file, state=self.state, diff=True, **self.kw)
+
+    def close(self):
+        """Leave the bar on screen and move below it."""
+        state = stream_state(self.file) if self.state is global_state else self.state
+        if state is not None:
+            state.clear()
+        print(file=self.file, flush=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -568,6 +568,13 @@ B_6_8      = "▆"
 B_7_8      = "▇"
 B_FULL     = "█"
 T_1_8       = "▔"
+L_1_8      = "▏"
+L_2_8      = "▎"
+L_3_8      = "▍"
+L_4_8      = "▌"
+L_5_8      = "▋"
+L_6_8      = "▊"
+L_7_8      = "▉"
 SH_1 = "░"
 SH_2 =  "▒"
 SH_3 = "▓"
@@ -0,0 +1,168 @@
+import shutil
+import sys
+
+import termite.cursor as cursor
+from termite.ansi import RESET, char_width, sgr_delta
+from termite.sim import Cell, sim
+from termite.terminal import FrameWriter
+
+BLANK = Cell(" ")
+WIDE_TAIL = Cell("")  # the second column taken by a wide character
+
+# used when the terminal has no terminfo entry for them
+_DEFAULT_CAPS = {
+    "smcup": "\x1b[?1049h",
+    "rmcup": "\x1b[?1049l",
+    "civis": "\x1b[?25l",
+    "cnorm": "\x1b[?25h",
+    "clear": "\x1b[H\x1b[2J",
+}
+
+
+class Screen:
+    """
+    Full-screen, double-buffered drawing on the alternate screen.
+
+    Draw the next frame into the back buffer with `write` (styled text, e.g. from `sub`), then `refresh`:
+    only the cells which differ from what is on screen (the front buffer) are written,
+    with the shortest cursor moves and style changes, in a single write.
+
+    ```python
+    with Screen() as screen:
+        while True:
+            screen.clear()
+            screen.write(0, 0, sub("BOLD[cpu] ") + f"{cpu}%")
+            screen.refresh()
+            time.sleep(1)
+    ```
+    """
+
+    def __init__(self, file=sys.stdout, size: tuple[int, int] | None = None, alternate: bool = True, hide_cursor: bool = True):
+        self.file = file
+        self.alternate = alternate
+        self.hide_cursor = hide_cursor
+        self.cols, self.rows = size or shutil.get_terminal_size()
+        self.back = self._blank()
+        self.front = self._blank()
+        self._pos = None  # (row, col) of the terminal cursor, None if unknown
+        self._sgr = ""  # style active on the terminal
+
+    def _blank(self) -> list[list[Cell]]:
+        return [[BLANK] * self.cols for _ in range(self.rows)]
+
+    @staticmethod
+    def _cap(name: str) -> str:
+        return cursor.probe().get(name) or _DEFAULT_CAPS[name]
+
+    def _send(self, *parts: str):
+        FrameWriter(self.file).write(*parts).send()
+
+    def enter(self):
+        """Switch to the alternate screen and clear it."""
+        self._send(self._cap("smcup") if self.alternate else "",
+                   self._cap("civis") if self.hide_cursor else "",
+                   RESET,
+                   self._cap("clear"))
+        self.front = self._blank()
+        self._pos = (0, 0)
+        self._sgr = ""
+
+    def exit(self):
+        """Go back to the normal screen."""
+        self._send(RESET,
+                   self._cap("cnorm") if self.hide_cursor else "",
+                   self._cap("rmcup") if self.alternate else "")
+
+    def __enter__(self):
+        self.enter()
+        return self
+
+    def __exit__(self, *exc):
+        self.exit()
+
+    def resize(self, size: tuple[int, int] | None = None):
+        """Adapt to a new terminal size (e.g. on SIGWINCH); the next refresh redraws everything."""
+        self.cols, self.rows = size or shutil.get_terminal_size()
+        self.back = self._blank()
+        self.front = self._blank()
+        self._send(RESET, self._cap("clear"))
+        self._pos = (0, 0)
+        self._sgr = ""
+
+    def clear(self):
+        """Blank the back buffer."""
+        self.back = self._blank()
+
+    def write(self, row: int, col: int, text: str):
+        """Draw (styled) text into the back buffer, at `row`/`col`, clipped to the screen."""
+        for i, line in enumerate(sim(text)):
+            r = row + i
+            if r >= self.rows:
+                break
+            if r < 0:
+                continue
+            cells = self.back[r]
+            c = col
+            wrote = False
+            for cell in line:
+                w = char_width(cell.ch)
+                if w == 0:
+                    continue
+                if c + w > self.cols:
+                    break
+                if c >= 0:
+                    if not wrote and cells[c] is WIDE_TAIL:
+                        cells[c - 1] = BLANK  # half of a wide char is overwritten
+                    cells[c] = cell
+                    if w == 2:
+                        cells[c + 1] = WIDE_TAIL
+                    wrote = True
+                elif c + w > 0:
+                    cells[0] = BLANK  # wide char cut by the left edge
+                    wrote = True
+                c += w
+            if wrote and c < self.cols and cells[c] is WIDE_TAIL:
+                cells[c] = BLANK
+
+    def _move(self, row: int, col: int) -> str:
+        """The shortest sequence moving the cursor to (row, col)."""
+        options = [cursor.pos(row, col)]
+        if self._pos is not None:
+            r, c = self._pos
+            if r == row:
+                if col > c:
+                    options.append(cursor.right(col - c))
+                elif col < c:
+                    options.append(cursor.left(c - col))
+                options.append(cursor.col(col))
+            elif c == col:
+                options.append(cursor.down(row - r) if row > r else cursor.up(r - row))
+        return min(options, key=len)
+
+    def refresh(self) -> str:
+        """Write the cells which changed since the last refresh, and return what was written."""
+        frame = FrameWriter(self.file)
+        sgr = self._sgr
+        for row in range(self.rows):
+            front, back = self.front[row], self.back[row]
+            if front == back:
+                continue
+            for col in range(self.cols):
+                b = back[col]
+                f = front[col]
+                if b is f or (b.ch == f.ch and b.sgr == f.sgr) or b is WIDE_TAIL:
+                    continue
+                if self._pos != (row, col):
+                    frame.write(self._move(row, col))
+                if b.sgr != sgr:
+                    frame.write(sgr_delta(sgr, b.sgr))
+                    sgr = b.sgr
+                frame.write(b.ch)
+                col += char_width(b.ch)
+                # past the last column the cursor position depends on the terminal
+                self._pos = (row, col) if col < self.cols else None
+            self.front[row] = list(back)
+        if sgr:
+            frame.write(RESET)
+        self._sgr = ""
+        return frame.send()
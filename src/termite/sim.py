@@ -1,50 +1,23 @@
-import re
-from dataclasses import dataclass
-
-CSI_RE = re.compile(r"\x1b\[([0-9;]*)([A-Za-z])")
-
-CURSOR_CMDS = {
-    "A",  # up      (ignored in 1D)
-    "B",  # down    (ignored)
-    "C",  # right
-    "D",  # left
-    "E",  # next line
-    "F",  # prev line
-    "G",  # goto column
-    "H",  # row/column
-    "f",  # row/column
-    "S",  # scroll up   (ignored)
-    "T",  # scroll down (ignored)
-}
-
-
-def _parse_csi_nums(params_str: str) -> list[int]:
-    if not params_str:
-        return [1]
-    parts = params_str.split(";")
-    nums = []
-    for p in parts:
-        if p == "":
-            nums.append(0)
-        else:
-            try:
-                nums.append(int(p))
-            except ValueError:
-                nums.append(0)
-    if not nums:
-        nums = [1]
-    return nums
+from termite.ansi import tokenize, csi_parts, csi_nums, sgr_apply, TEXT, CSI, CTRL, ESC, CURSOR_CMDS
 
 RESET = "\x1b[0m"
 
 
 
 class Cell:
+    __slots__ = ("ch", "sgr")
+
     def __init__(self, ch: str, sgr: str = ""):
         self.ch = ch
         self.sgr = sgr
-        self.raw = ch
-        self.styled = sgr + ch + RESET
+
+    @property
+    def raw(self):
+        return self.ch
+
+    @property
+    def styled(self):
+        return self.sgr + self.ch + RESET
 
     def __str__(self):
         return self.styled
@@ -71,9 +44,11 @@ def encode_cells(cell_lines: list[list[Cell]] | list[Cell] | Cell) -> str:
         for cell in line:
             # style change?
             if cell.sgr != prev_sgr:
-                # need a reset?
+                # sgr is the full active style, so reset whatever was active before
                 if cell.sgr == "":
                     parts.append(RESET)
+                elif prev_sgr:
+                    parts.append(RESET + cell.sgr)
                 else:
                     parts.append(cell.sgr)
 
@@ -101,6 +76,18 @@ def merge_unstyled_cells(cell_lines: list[list[Cell]] | list[Cell] | Cell) -> st
     return "\n".join("".join(ch.ch for ch in line) for line in cell_lines)
 
 
+class _CellCache(dict):
+    """Cells of one style by character: cells are never mutated, so equal ones are shared."""
+
+    def __init__(self, sgr: str):
+        super().__init__()
+        self.sgr = sgr
+
+    def __missing__(self, ch: str) -> Cell:
+        cell = self[ch] = Cell(ch, self.sgr)
+        return cell
+
+
 class CellLines(list):
     @property
     def styled(self):
@@ -146,49 +133,70 @@ def sim(s: str) -> CellLines:
     """
     Simulate a 1D terminal with:
       - SGR ('m') tracked as current style
-      - cursor movement CSI handled (left/right/column/next/prev line)
+      - cursor movement handled (left/right/column/next/prev line, \\r, \\b, save/restore)
       - printable chars overwrite at cursor
     Returns: list of lines, each a list[Cell].
     """
     lines: list[list[Cell]] = [[]]
     cursor = 0
-    current_sgr = ""  # raw SGR string (e.g. "\x1b[31m")
-
-    i = 0
-    n = len(s)
-
-    while i < n:
-        ch = s[i]
-
-        # Newline: commit line, start next
-        if ch == "\n":
-            lines.append([])
-            cursor = 0
-            i += 1
-            continue
-
-        # CSI sequence?
-        if ch == "\x1b" and i + 1 < n and s[i + 1] == "[":
-            m = CSI_RE.match(s, i)
-            if not m:
-                i += 1
-                continue
-
-            params_str, cmd = m.groups()
-            i = m.end()
+    saved = 0
+    current_sgr = ""  # normalized active style (e.g. "\x1b[1;31m"), "" when unstyled
+    caches = {"": _CellCache("")}
+    cells = caches[""]
+    blank = cells[" "]
+
+    def put(start: int, end: int):
+        nonlocal cursor
+        run = list(map(cells.__getitem__, s[start:end]))
+        line = lines[-1]
+        if cursor > len(line):
+            # pad with unstyled spaces if we jumped ahead
+            line.extend([blank] * (cursor - len(line)))
+        line[cursor:cursor + len(run)] = run
+        cursor += len(run)
+
+    for kind, start, end in tokenize(s):
+        if kind is TEXT:
+            # Printable run: written over the line at the cursor in one slice
+            put(start, end)
+
+        elif kind is CTRL:
+            ch = s[start]
+            if ch == "\n":
+                # Newline: commit line, start next
+                lines.append([])
+                cursor = 0
+            elif ch == "\r":
+                cursor = 0
+            elif ch == "\b":
+                cursor = max(0, cursor - 1)
+            elif ch == "\t":
+                # keep tabs as-is rather than guessing tab stops
+                put(start, end)
+
+        elif kind is ESC:
+            if s[start + 1] == "7":
+                saved = cursor
+            elif s[start + 1] == "8":
+                cursor = saved
+
+        elif kind is CSI:
+            params_str, cmd = csi_parts(s, start, end)
 
             # SGR (style/color)
             if cmd == "m":
-                # normalize back to a single SGR sequence string
-                if params_str == "":
-                    current_sgr = "\x1b[0m"
-                else:
-                    current_sgr = f"\x1b[{params_str}m"
+                current_sgr = sgr_apply(current_sgr, params_str)
+                cells = caches.get(current_sgr) or caches.setdefault(current_sgr, _CellCache(current_sgr))
                 continue
 
+            if cmd == "s":
+                saved = cursor
+            elif cmd == "u":
+                cursor = saved
+
             # Cursor movement
-            if cmd in CURSOR_CMDS:
-                nums = _parse_csi_nums(params_str)
+            elif cmd in CURSOR_CMDS:
+                nums = csi_nums(params_str)
 
                 if cmd == "D":  # left
                     count = nums[0] or 1
@@ -214,28 +222,10 @@ def sim(s: str) -> CellLines:
                     cursor = 0
 
                 # A/B/S/T (vertical/scroll) ignored in this 1D model
-                continue
 
             # Other CSI (J, K, etc.) ignored for layout
-            continue
-
-        # Printable char: write/overwrite at cursor
-        if ch >= " " and ch != "\x7f":
-            line = lines[-1]
-            if cursor >= len(line):
-                # pad with unstyled spaces if we jumped ahead
-                while len(line) < cursor:
-                    line.append(Cell(" ", sgr=""))
-                line.append(Cell(ch, sgr=current_sgr))
-            else:
-                line[cursor] = Cell(ch, current_sgr)
-            cursor += 1
-
-        i += 1
-
-    # Ensure at least one line
-    if not lines:
-        lines = CellLines([[]])
+
+        # OSC (titles, hyperlinks) and partial escapes are invisible
 
     return CellLines(lines)
 
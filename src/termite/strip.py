@@ -1,40 +1,9 @@
-import re
-from typing import List
-
-# Match any CSI sequence: ESC [ params cmd
-CSI_RE = re.compile(r"\x1b\[([0-9;]*)([A-Za-z])")
-
-# SGR parameter sets
-FG_CODES = {
-    30, 31, 32, 33, 34, 35, 36, 37, 39,
-    90, 91, 92, 93, 94, 95, 96, 97,
-}
-BG_CODES = {
-    40, 41, 42, 43, 44, 45, 46, 47, 49,
-    100, 101, 102, 103, 104, 105, 106, 107,
-}
-STYLE_CODES = {
-    1, 2, 3, 4, 5, 7, 8, 9,
-    21, 22, 23, 24, 25, 27, 28, 29,
-    51, 52, 53, 54, 55,
-}
-# Extended color SGR introducers: 38 (fg), 48 (bg), 58 (underline color)
-EXT_COLOR_CODES = {38, 48, 58}
-
-# CSI commands that move the cursor (we'll remove these when requested)
-CURSOR_CMDS = {
-    "A",  # CUU - cursor up
-    "B",  # CUD - cursor down
-    "C",  # CUF - cursor forward (right)
-    "D",  # CUB - cursor backward (left)
-    "E",  # CNL - cursor next line
-    "F",  # CPL - cursor previous line
-    "G",  # CHA - cursor horizontal absolute
-    "H",  # CUP - cursor position
-    "f",  # HVP - horizontal & vertical position (alias)
-    "S",  # SU - scroll up
-    "T",  # SD - scroll down
-}
+from typing import Iterable, Iterator, List
+
+from termite.ansi import (
+    tokenize, csi_parts, csi_nums, TEXT, CSI, CTRL, ESC, PARTIAL,
+    CURSOR_CMDS, FG_CODES, BG_CODES, STYLE_CODES, EXT_COLOR_CODES, sgr_apply,
+)
 
 
 def _parse_sgr_params(params_str: str) -> List[int]:
@@ -122,6 +91,61 @@ def _filter_sgr_params(
     return kept
 
 
+def _filter_sgr(
+        s: str,
+        remove_fg_colors: bool,
+        remove_bg_colors: bool,
+        remove_styles: bool,
+        remove_reset: bool,
+) -> str:
+    """Filter the SGR codes in `s`, leaving every other escape sequence untouched."""
+    remove_all = remove_fg_colors and remove_bg_colors and remove_styles and remove_reset
+    out: list[str] = []
+    last = 0
+    for kind, start, end in tokenize(s):
+        if kind is not CSI or s[end - 1] != "m":
+            continue
+        params_str = s[start + 2:end - 1]
+        if remove_all:
+            sgr = ""
+        elif not params_str.replace(";", "").isdigit() and params_str:
+            # sub-parameters (38:2::r:g:b) or private SGRs, keep as-is
+            continue
+        else:
+            filtered = _filter_sgr_params(
+                _parse_sgr_params(params_str),
+                remove_fg_colors=remove_fg_colors,
+                remove_bg_colors=remove_bg_colors,
+                remove_styles=remove_styles,
+                remove_reset=remove_reset,
+            )
+            sgr = "\x1b[" + ";".join(str(p) for p in filtered) + "m" if filtered else ""
+        out.append(s[last:start])
+        out.append(sgr)
+        last = end
+    if not last:
+        return s
+    out.append(s[last:])
+    return "".join(out)
+
+
+def _strip(
+        s: str,
+        remove_fg_colors: bool,
+        remove_bg_colors: bool,
+        remove_styles: bool,
+        remove_cursor_actions: bool,
+        remove_reset: bool,
+) -> str:
+    if not remove_cursor_actions:
+        return _filter_sgr(s, remove_fg_colors, remove_bg_colors, remove_styles, remove_reset)
+    if remove_fg_colors and remove_bg_colors and remove_styles:
+        return "\n".join(_sim_lines(s))
+    # some styling survives: simulate cells so it stays attached to the right characters
+    from termite.sim import sim
+    return sim(_filter_sgr(s, remove_fg_colors, remove_bg_colors, remove_styles, remove_reset)).styled
+
+
 def strip_text(
         s: str,
         remove_fg_colors: bool = True,   # remove foreground colors, including rgb
@@ -131,117 +155,204 @@ def strip_text(
         remove_reset: bool | None = None,
 ) -> str:
     """
-    Strip / filter ANSI CSI sequences in `s` according to flags.
-    - Only touches CSI sequences (ESC [ ... cmd).
+    Strip / filter ANSI escape sequences in `s` according to flags.
     - SGR ('m') codes are filtered by color/style flags.
-    - Cursor movement CSI commands are removed when remove_cursor_actions=True.
-    - Other CSI commands (e.g. clear screen 'J', 'K') are left untouched.
+    - With remove_cursor_actions=True, cursor movement is simulated (see `_sim_lines`)
+      and every other escape sequence (clears, titles, hyperlinks, ...) is dropped.
+    - Otherwise, escape sequences other than SGR are left untouched.
     """
     # print(f"stripping: {s!r}")
     if remove_reset is None:
         # default: reset is removed iff we're removing all three categories
         remove_reset = remove_fg_colors and remove_bg_colors and remove_styles
 
-    def repl(m: re.Match) -> str:
-        params_str, cmd = m.groups()
-
-        # SGR: ESC [ ... m
-        if cmd == "m":
-            params = _parse_sgr_params(params_str)
-            filtered = _filter_sgr_params(
-                params,
-                remove_fg_colors=remove_fg_colors,
-                remove_bg_colors=remove_bg_colors,
-                remove_styles=remove_styles,
-                remove_reset=remove_reset,
-            )
-            if not filtered:
-                return ""  # drop entire SGR
-            return "\x1b[" + ";".join(str(p) for p in filtered) + "m"
-
-        # Other CSI commands (e.g. J/K clear) -> keep as-is
-        return m.group(0)
-
-    r =CSI_RE.sub(repl, s)
-    
+    r = _strip(s, remove_fg_colors, remove_bg_colors, remove_styles, remove_cursor_actions, remove_reset)
     if remove_cursor_actions:
-        r = _sim_text(r)
+        r = r.rstrip("\n")
     # print(f"returning: {r!r}")
     return r
 
 
+def _sgr_state(s: str, state: str = "") -> str:
+    """The style active after `s`, starting from the style `state` (see `sgr_apply`)."""
+    for kind, start, end in tokenize(s):
+        if kind is CSI and s[end - 1] == "m":
+            state = sgr_apply(state, csi_parts(s, start, end)[0])
+    return state
+
 
+# Longest escape sequence we expect to be cut in half by a chunk boundary (OSC hyperlinks can be long)
+_MAX_PARTIAL = 4096
 
 
-def _parse_csi_nums(params_str: str) -> list[int]:
-    if not params_str:
-        return [1]
-    parts = params_str.split(";")
-    nums = []
-    for p in parts:
-        if p == "":
-            nums.append(0)
+def strip_stream(
+        chunks: Iterable[str],
+        remove_fg_colors: bool = True,
+        remove_bg_colors: bool = True,
+        remove_styles: bool = True,
+        remove_cursor_actions: bool = True,
+        remove_reset: bool | None = None,
+) -> Iterator[str]:
+    """
+    Streaming version of `strip_text`: strip / filter the text arriving in `chunks`,
+    yielding the filtered text as soon as it is safe to do so.
+
+    Chunks may be cut anywhere, including in the middle of an escape sequence.
+    - With remove_cursor_actions=True, output is produced one batch of complete lines
+      at a time, since cursor movement can rewrite anything up to the next newline.
+    - Otherwise, everything but a trailing partial escape sequence is emitted right away.
+    Unlike `strip_text`, trailing newlines are preserved.
+    """
+    if remove_reset is None:
+        remove_reset = remove_fg_colors and remove_bg_colors and remove_styles
+    flags = (remove_fg_colors, remove_bg_colors, remove_styles, remove_cursor_actions, remove_reset)
+
+    # with styling kept, each batch of lines is simulated on its own: it starts with the style
+    # the previous one left active
+    carry_style = remove_cursor_actions and not (remove_fg_colors and remove_bg_colors and remove_styles)
+    state = ""
+    pending: list[str] = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if remove_cursor_actions:
+            nl = chunk.rfind("\n")
+            if nl < 0:
+                # no complete line yet, keep accumulating
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:nl])
+            block = "".join(pending)
+            pending = [chunk[nl + 1:]]
+            if carry_style:
+                block = state + block
+                state = _sgr_state(block)
+            yield _strip(block, *flags) + "\n"
         else:
-            try:
-                nums.append(int(p))
-            except ValueError:
-                nums.append(0)
-    if not nums:
-        nums = [1]
-    return nums
+            pending.append(chunk)
+            text = "".join(pending)
+            cut = len(text)
+            esc = text.rfind("\x1b", max(0, cut - _MAX_PARTIAL))
+            if esc >= 0:
+                for kind, start, end in tokenize(text, esc):
+                    if kind is PARTIAL:
+                        cut = start
+                    break
+            pending = [text[cut:]]
+            if cut:
+                yield _strip(text[:cut], *flags)
+
+    rest = "".join(pending)
+    if rest and carry_style:
+        rest = state + rest
+    if rest:
+        yield strip_text(
+            rest,
+            remove_fg_colors=remove_fg_colors,
+            remove_bg_colors=remove_bg_colors,
+            remove_styles=remove_styles,
+            remove_cursor_actions=remove_cursor_actions,
+            remove_reset=remove_reset,
+        )
 
 
 def _sim_text(s: str) -> str:
+    """
+    Simulate a tiny terminal on text `s` and return the resulting text.
+    See `_sim_lines` for what is simulated.
+    """
+    return "\n".join(_sim_lines(s)).rstrip("\n")
+
+
+def _sim_lines(s: str) -> list[str]:
     """
     Simulate a tiny terminal on text `s`:
 
-    - First strips colors/styles (SGR) but keeps cursor movement and clears.
+    - Drops colors/styles (SGR) and every escape that doesn't move the cursor.
     - Handles:
         ESC[nD  (left)
         ESC[nC  (right)
         ESC[nG  (goto column)
         ESC[nH / ESC[n;mf  (row/column) -> we only use column
         ESC[E/F  (next/prev line) -> we start new lines
+        ESC 7 / ESC 8, ESC[s / ESC[u  (save/restore cursor column)
+        \r, \b  (carriage return, backspace)
     - Overwrites characters when the cursor moves back and prints more.
     - Newlines in the input start a new simulated line.
     - Vertical cursor moves (A/B/S/T) are ignored for now (no 2D buffer).
     """
-    
-
     lines: list[str] = []
-    buf: list[str] = []
+    buf: list[str] = []  # the current line: runs of text, or one char per column once `flat`
+    size = 0             # length of the current line
+    flat = False         # only needed once the cursor moves back into the line
     cursor = 0
-
-    i = 0
-    n = len(s)
-
-    while i < n:
-        ch = s[i]
-
-        # newline -> commit line, reset buffer/cursor
-        if ch == "\n":
-            lines.append("".join(buf))
-            buf = []
-            cursor = 0
-            i += 1
-            continue
-
-        # Try to parse CSI
-        if ch == "\x1b" and i + 1 < n and s[i + 1] == "[":
-            m = CSI_RE.match(s, i)
-            if not m:
-                # malformed, just skip ESC
-                i += 1
+    saved = 0
+
+    def put(run: str):
+        nonlocal buf, size, flat, cursor
+        n = len(run)
+        if cursor >= size:
+            # appending (the common case): keep whole runs
+            pad = " " * (cursor - size)
+            if flat:
+                buf.extend(pad)
+                buf.extend(run)
+            else:
+                if pad:
+                    buf.append(pad)
+                buf.append(run)
+            size = cursor + n
+        else:
+            # overwriting: switch to one char per column and write the run as one slice
+            if not flat:
+                buf = list("".join(buf))
+                flat = True
+            buf[cursor:cursor + n] = run
+            size = max(size, cursor + n)
+        cursor += n
+
+    for kind, start, end in tokenize(s):
+        if kind is TEXT:
+            # Printable run -> write/overwrite at cursor
+            put(s[start:end])
+
+        elif kind is CTRL:
+            ch = s[start]
+            if ch == "\n":
+                # newline -> commit line, reset buffer/cursor
+                lines.append("".join(buf))
+                buf = []
+                size = 0
+                flat = False
+                cursor = 0
+            elif ch == "\r":
+                cursor = 0
+            elif ch == "\b":
+                cursor = max(0, cursor - 1)
+            elif ch == "\t":
+                # keep tabs as-is rather than guessing tab stops
+                put(ch)
+
+        elif kind is ESC:
+            if s[start + 1] == "7":
+                saved = cursor
+            elif s[start + 1] == "8":
+                cursor = saved
+
+        elif kind is CSI:
+            params_str, cmd = csi_parts(s, start, end)
+
+            if cmd == "s":
+                saved = cursor
+                continue
+            if cmd == "u":
+                cursor = saved
                 continue
-
-            params_str, cmd = m.groups()
-            i = m.end()
-
             if cmd not in CURSOR_CMDS:
-                # non-cursor CSI (e.g. J/K clears) -> ignore for layout
+                # non-cursor CSI (e.g. SGR, J/K clears) -> ignore for layout
                 continue
 
-            nums = _parse_csi_nums(params_str)
+            nums = csi_nums(params_str)
 
             if cmd == "D":  # left
                 count = nums[0] or 1
@@ -267,30 +378,17 @@ def _sim_text(s: str) -> str:
                 # Commit current line and start a new one
                 lines.append("".join(buf))
                 buf = []
+                size = 0
+                flat = False
                 cursor = 0
 
             # A, B, S, T (vertical moves/scroll) we just ignore in this 1D model
 
-            continue
-
-        # Printable char -> write/overwrite at cursor
-        if ch >= " " and ch != "\x7f":
-            if cursor >= len(buf):
-                # pad with spaces if cursor jumped ahead
-                buf.extend(" " for _ in range(cursor - len(buf)))
-                buf.append(ch)
-            else:
-                buf[cursor] = ch
-            cursor += 1
-
-        i += 1
-
-    # Flush last line
-    if buf or not lines:
-        lines.append("".join(buf))
+        # OSC (titles, hyperlinks) and partial escapes are invisible
 
-    s = "\n".join(lines).rstrip("\n")
-    return s
+    # Flush last line (possibly empty, so that a trailing newline is kept)
+    lines.append("".join(buf))
+    return lines
 
 
 def stripped_length(s, **kw):
@@ -311,4 +409,9 @@ if __name__ == "__main__":
     
     print("one line\nsecond\x1b[3DXXX")
     print(strip_text("one line\nsecond\x1b[3DXXX"))
-# -> "one line\nseXXXd"
\ No newline at end of file
+# -> "one line\nseXXXd"
+    # streamed output doesn't depend on where the chunks are cut, even with styling kept
+    s = "\x1b[31mred\nstill red\n\x1b[1mbold \x1b[2Cx\x1b[0m\nplain"
+    outs = {"".join(strip_stream((s[i:i + n] for i in range(0, len(s), n)), remove_fg_colors=False))
+            for n in range(1, len(s) + 1)}
+    assert len(outs) == 1, outs
@@ -1,5 +1,6 @@
 # === Text Attributes ===
-from termite.tc import TC, TerminalCode
+from termite.tc import TC, TerminalCode, PLAIN
+from termite.mode import color_enabled
 import termite.raw as r
 
 BOLD       = TC(r.BOLD      , "bold", "styles")
@@ -41,6 +42,8 @@ styles = Styles()
 
 
 def get_style(style: list[str] | str | None = None):
+    if not color_enabled():
+        return PLAIN
     if isinstance(style, TerminalCode):
         return style
     if not style:
@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from functools import lru_cache
 
 import termite.raw.bg_colors as R_bg
 import termite.raw.fg_colors as R_fg
@@ -14,6 +15,7 @@ from termite.colors import to_rgb, TerminalCode, merge_colors
 from termite.emojis import emoji_names, emojis, dashed_emoji_names
 from termite.unicode import unicode_names, unicode, dashed_unicode_names
 from termite.raw import FG_RGB, BG_RGB
+from termite.mode import color_enabled, color_mode, ALWAYS, NEVER
 
 OPENER="["
 CLOSER="]"
@@ -27,7 +29,8 @@ ESC_END="%"
 Rk = dir(R_fg) + dir(R_bg) + dir(R_s)
 
 color_keys = [x for x in Rk if x.upper() == x and not x.startswith('_') and not x.endswith("HEX") and not x.endswith("RGB") and not x.endswith("HEADER")]
-color_values = {k.replace("_", ""): getattr(t, k)  for k in color_keys}
+with color_mode(ALWAYS):  # the table holds the real codes, whatever the mode at import
+    color_values = {k.replace("_", ""): getattr(t, k)  for k in color_keys}
 color_keys = list(color_values)
 hex_colors = [x for x in dir(R_h) if x.endswith("HEX")]
 for k in hex_colors:
@@ -43,6 +46,7 @@ for k in list(color_keys):
         color_keys.append(k)
         color_values[kr] = color_values[k]
 color_keys = list(sorted(color_keys, key=len, reverse=True))
+_color_codes = set(color_values.values())
 
 
 
@@ -52,8 +56,9 @@ cursor_actions = {
     "RIGHT": cursor.right(),
     "UP": cursor.up(),
     "DOWN": cursor.down(),
-    "SAVE": cursor.save(),
-    "RESTORE": cursor.restore()
+    # resolved when sub() runs, so importing doesn't probe the terminal
+    "SAVE": cursor.save,
+    "RESTORE": cursor.restore
 }
 cursor_keys = list(sorted(list(cursor_actions.keys()), key=len, reverse=True))
 
@@ -125,6 +130,7 @@ class Token(Node):
         self.opened = None
         self.content = ""
         self.end = None
+        self.resolve = None  # callable giving the value when it can change between calls
 
 
     def open(self, end=R_fg.RESET, opener=OPENER):
@@ -157,8 +163,9 @@ class EndToken:
     def __repr__(self):
         return f"EndToken<{self.value!r}>" if self.value is not None else f"EndToken<)>"
 
-def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, closer=CLOSER, joiner=JOINER, esc=ESC, esc_end=ESC_END, raw=False):
-    text = "".join(text)
+@lru_cache(maxsize=None)
+def _trie(color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER) -> Token:
+    """The lookup trie of every key, built once for each prefix/suffix/opener (sub() only reads it)."""
     root = Token()
     for k in color_keys:
         node = root.set(color_prefix + k + color_suffix)
@@ -167,7 +174,13 @@ def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, clo
 
     for k in cursor_actions:
         node = root.set(color_prefix + k + color_suffix)
-        node.value = cursor_actions[k]
+        v = cursor_actions[k]
+        if callable(v):
+            # resolved each time it is used, like the cursor mode it depends on
+            node.resolve = v
+            node.value = v()
+        else:
+            node.value = v
 
     for k in cursor_function_keys:
         node = root.set(color_prefix + k + color_suffix)
@@ -185,6 +198,16 @@ def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, clo
     root.set(color_prefix + "bgrgb" + color_suffix).open(opener=opener).value = "bgrgb" + opener
     root.set(color_prefix + "rgba" + color_suffix).open(opener=opener).value = "rgba" + opener
     root.set(color_prefix + "bgrgba" + color_suffix).open(opener=opener).value = "bgrgba" + opener
+    return root
+
+
+def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, closer=CLOSER, joiner=JOINER, esc=ESC, esc_end=ESC_END, raw=False):
+    text = "".join(text)
+    root = _trie(color_prefix, color_suffix, opener)
+
+    # with colors off, color values and their closing RESETs are dropped while collecting the content
+    plain = not color_enabled()
+    rgb_codes = set()
 
     tokens = [root.clone()] # list of Token or str
     escaped = False
@@ -233,8 +256,11 @@ def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, clo
                             tk.value  = T(*to_rgb((int(r), int(g), int(b), float(a) if float(a) <= 1 else float(a)/255), (int(br), int(bg), int(bb), float(ba) if float(ba) <= 1 else float(ba)/255)))
                         else:
                             raise ValueError("invalid value")
+                        if plain:
+                            rgb_codes.add(tk.value)
                         tk.prefix = ""
                         tk.full_text = ""
+                        tk.children = dict(tk.children)  # open() adds a child: keep it out of the shared trie
                         tk.open()
                         tokens.pop()
                     else:
@@ -275,12 +301,14 @@ def sub(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, clo
     for t in tokens:
         if isinstance(t, EndToken):
             if t.value is not None:
-                current_list.append(t.value)
+                if not plain:
+                    current_list.append(t.value)
             else:
                 all_levels.pop()
                 current_list = all_levels[-1]
         elif t.value and t.func is None:
-            current_list.append(t.value)
+            if not (plain and (isinstance(t.value, TerminalCode) or t.value in _color_codes or t.value in rgb_codes)):
+                current_list.append(t.resolve() if t.resolve is not None else t.value)
         elif t.func:
             x = []
             current_list.append((x, t.func))
@@ -383,10 +411,12 @@ def _resolve_file(file):
     return file
 
 def subprint(*text: str, color_prefix=PREFIX, color_suffix=SUFFIX, opener=OPENER, closer=CLOSER, joiner=JOINER, esc=ESC, esc_end=ESC_END, raw=False, print=print, **kwargs):
-    s = sub(*text, color_prefix=color_prefix, color_suffix=color_suffix, opener=opener, closer=closer, joiner=joiner, esc=esc, esc_end=esc_end, raw=raw)
     # Handle special file values
     if "file" in kwargs:
         kwargs["file"] = _resolve_file(kwargs["file"])
+    # in auto mode, colors depend on where we print
+    with color_mode(ALWAYS if color_enabled(kwargs.get("file")) else NEVER):
+        s = sub(*text, color_prefix=color_prefix, color_suffix=color_suffix, opener=opener, closer=closer, joiner=joiner, esc=esc, esc_end=esc_end, raw=raw)
 
     print(s, **kwargs)
 
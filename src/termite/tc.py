@@ -1,5 +1,6 @@
 import termite.raw as r
 from termite.cases import cases
+from termite.mode import color_enabled
 raw_colors = r
 
 BaseColor = int | str | tuple[int, int, int] | tuple[int, int, int, float] | tuple[int, int, int, int]
@@ -140,6 +141,8 @@ class TerminalCode(str):
         return [x.name for x in self.reverse_registry[str(self)] if x.name != self.name]
 
     def __call__(self, text: str = ""):
+        if not color_enabled():
+            return str(text)
         return self + text + r.RESET
 
     def __add__(self, other):
@@ -157,4 +160,7 @@ class TerminalCode(str):
         print(self(m), **kw)
 
 
-TC = TerminalCode
\ No newline at end of file
+TC = TerminalCode
+
+# what colors and styles resolve to when colors are off
+PLAIN = TerminalCode("", "empty", "text")
\ No newline at end of file
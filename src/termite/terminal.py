@@ -1,41 +1,247 @@
+import builtins
+import contextlib
+import os
+import queue
 import sys
+import threading
+import weakref
+from typing import TYPE_CHECKING
 
+from termite.ansi import CSI, RESET, TEXT, tokenize, sgr_apply, char_width, visible_width
 from termite.chars import BACKSPACE
 import termite.cursor  as cursor
 from termite.sub import sub as substitute
 from termite.fancy import t
+from termite.mode import color_enabled, color_mode, ALWAYS, NEVER
+
+if TYPE_CHECKING:
+    import concurrent.futures
 
 complete = lambda x: t.write_ahead(t.GRAY(x))
 
 
-global_state = {}
-def cprint(*pre: str,
-          completion: str="",
-          overwrite: bool = True,
-          overwrite_line_count: int | None = None,
-          file=sys.stdout,
-           end="", # kwargs to pass to print
-          print=print, # by default, use the print builtin, but allow overriding
-          state: dict | None = global_state, # this is INTENTIONALLY mutable
-          sub: bool = False,
-           **kw,
-          ):
-    print = print or (lambda *a, **kw: None)
+class FrameWriter:
+    """
+    Builds a whole terminal update (clears, cursor moves, content) in one buffer,
+    then sends it with a single write + flush, so the terminal never shows half a frame.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+        self.parts: list[str] = []
+
+    def write(self, *text: str) -> "FrameWriter":
+        self.parts.extend(text)
+        return self
+
+    def clear_lines(self, n: int) -> "FrameWriter":
+        """Clear the current line and the n - 1 lines above it, leaving the cursor at the start of the top one."""
+        if n > 0:
+            self.parts.append((cursor.clear_line() + cursor.up()) * (n - 1) + cursor.clear_line())
+        return self
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
+
+    def send(self, print=builtins.print) -> str:
+        """Send the frame (`print=None` only builds it) and start a new one."""
+        frame = self.getvalue()
+        self.parts = []
+        if frame and print is not None:
+            file = self.file if self.file is not None else sys.stdout
+            if print is builtins.print:
+                file.write(frame)
+                file.flush()
+            else:
+                print(frame, end="", flush=True, file=file)
+        return frame
+
+
+    def move(self, row: int, col: int, to_row: int, to_col: int) -> "FrameWriter":
+        """Move the cursor from (row, col) to (to_row, to_col), relative to the frame. A col of -1 means unknown."""
+        if to_row < row:
+            self.parts.append(cursor.up(row - to_row))
+        elif to_row > row:
+            self.parts.append(cursor.down(to_row - row))
+        if to_col != col:
+            self.parts.append(cursor.col(to_col))
+        return self
+
+
+def _end_style(s: str, style: str = "", pos: int = 0, endpos: int | None = None) -> str:
+    """The SGR style in effect after s[pos:endpos], starting from `style`."""
+    if "\x1b" not in s:
+        return style
+    for kind, start, end in tokenize(s, pos, endpos):
+        if kind == CSI and s[end - 1] == "m":
+            style = sgr_apply(style, s[start + 2:end - 1])
+    return style
+
+
+def _frame_lines(text: str) -> list[tuple[str, str]]:
+    """Split a frame into (style at line start, line) pairs, so lines can be compared and redrawn on their own."""
+    lines = []
+    style = ""
+    for line in text.split("\n"):
+        lines.append((style, line))
+        style = _end_style(line, style)
+    return lines
+
+
+def _diff_start(old: str, new: str) -> int:
+    """Index in `new` from which it has to be redrawn over `old`, moved back to a token/character boundary."""
+    p = len(os.path.commonprefix((old, new)))
+    for kind, start, end in tokenize(new):
+        if end > p:
+            if kind != TEXT:
+                p = start
+            else:
+                # a combining mark changes the cell of the char before it
+                while p > start and (char_width(new[p]) == 0 or (p < len(old) and char_width(old[p]) == 0)):
+                    p -= 1
+            break
+    return p
+
+
+def _diff_frame(frame: FrameWriter, old: tuple, lines: list[tuple[str, str]], target: tuple[int, int]):
+    """Write into `frame` only what differs between the `old` (lines, cursor) and the new `lines`, then move to `target`."""
+    old_lines, (row, col) = old
+    for i, (style, line) in enumerate(lines):
+        if i < len(old_lines):
+            old_style, old_line = old_lines[i]
+            if old_style == style and old_line == line:
+                continue
+            p = _diff_start(old_line, line) if old_style == style else 0
+            # what is rewritten covers the old line unless that was wider
+            clear = visible_width(old_line) > visible_width(line)
+        else:
+            # a new row below the old frame: newlines create it
+            if row < len(old_lines) - 1:
+                frame.move(row, col, len(old_lines) - 1, col)
+                row = len(old_lines) - 1
+            frame.write("\n" * (i - row))
+            row, col = i, -1
+            p, clear = 0, False
+        to_col = visible_width(line[:p])
+        frame.move(row, col, i, to_col)
+        tail_style = _end_style(line, style, 0, p)
+        frame.write(tail_style, line[p:])
+        if _end_style(line, tail_style, p):
+            frame.write(RESET)
+        if clear:
+            frame.write(cursor.CLEAR_REST_OF_LINE)
+        row, col = i, visible_width(line)
+    # rows the new frame no longer uses
+    for i in range(len(lines), len(old_lines)):
+        frame.move(row, col, i, 0).write(cursor.CLEAR_REST_OF_LINE)
+        row, col = i, 0
+    frame.move(row, col, *target)
+
+
+class StreamState(dict):
+    """
+    The `cprint` state of one output stream (what was printed last),
+    with a lock so that threads updating the same stream don't interleave their frames.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.lock = threading.RLock()
+        self.pending = 0  # frames handed to the writer thread and not written yet
+
+
+_stream_states = weakref.WeakKeyDictionary()
+_stream_states_by_id = {}  # for streams which can't be weakly referenced
+_stream_states_lock = threading.Lock()
+
+
+def stream_state(file=None) -> StreamState:
+    """The shared `cprint` state of `file` (stdout by default)."""
+    file = sys.stdout if file is None else file
+    with _stream_states_lock:
+        try:
+            state = _stream_states.get(file)
+            if state is None:
+                state = _stream_states[file] = StreamState()
+        except TypeError:
+            state = _stream_states_by_id.setdefault(id(file), StreamState())
+    return state
+
+
+# the default state of cprint: stands for the state of whichever stream is printed to
+global_state = stream_state(sys.stdout)
+
+
+class _FrameQueue:
+    """A daemon thread writing frames in the order they were queued, so async callers never block on the terminal."""
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def put(self, state: dict, frame: FrameWriter, print=builtins.print) -> "concurrent.futures.Future":
+        """Queue a frame; its future resolves once it is written. Call with the state's lock held."""
+        import concurrent.futures  # only acprint queues frames: keep it out of `import termite`
+        future = concurrent.futures.Future()
+        if hasattr(state, "pending"):
+            state.pending += 1
+        self.queue.put((state, frame, print, future))
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="termite-writer", daemon=True)
+                self.thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            state, frame, print, future = self.queue.get()
+            try:
+                future.set_result(frame.send(print))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                lock = getattr(state, "lock", None)
+                if lock is not None:
+                    with lock:
+                        state.pending -= 1
+
+
+_frame_queue = _FrameQueue()
+
+
+def _cprint(frame: FrameWriter,
+            pre: tuple,
+            completion: str = "",
+            overwrite: bool = True,
+            overwrite_line_count: int | None = None,
+            state: dict | None = None,
+            sub: bool = False,
+            diff: bool = False,
+            **kw,
+            ) -> str:
+    """Compose a cprint update into `frame` without sending it, and return the printed text."""
     post = completion
     post = post or ""
     pre = "".join(pre)
     state = state if state is not None else {}
+    # diffing needs the previous frame, and only replaces the whole of it
+    diff = diff and overwrite and overwrite_line_count is None
+    old_frame = state.pop("frame", None)
+    if diff:
+        if old_frame is None:
+            # first frame, or the previous one was printed without diff: clear it the usual way
+            frame.clear_lines(state.get("old", "").count("\n") + 1)
+            old_frame = ([("", "")], (0, 0))
     # first, clear the old content if we are overwriting
-    if overwrite and (overwrite_line_count is None or overwrite_line_count > 0):
+    elif overwrite and (overwrite_line_count is None or overwrite_line_count > 0):
         # if overwrite_line_count is specified we will clear that many lines
         if overwrite_line_count is None:
             # if not specified, we will detect based on cached content
             overwrite_line_count = state.get("old", "").count("\n") + 1
 
         # now, clear the old rows
-        for _ in range(overwrite_line_count - 1):
-            print(cursor.clear_line() + cursor.up(), end="", flush=True, file=file)
-        print(cursor.clear_line(), end="", flush=True, file=file)
+        frame.clear_lines(overwrite_line_count)
 
 
     # Check if completion starts with backspaces (full replacement)
@@ -52,18 +258,92 @@ def cprint(*pre: str,
     completion = complete(post) if post else ""
 
     before_cursor = f"{prefix_stays}{replaced_highlight}"
-    if before_cursor:
-        if sub:
-            before_cursor = substitute(before_cursor, **kw)
-        print(before_cursor, end="", flush=True, file=file)
-    if completion:
-        if sub:
-            completion = substitute(completion, **kw)
-        print(completion, end="", flush=True, file=file)
+    if before_cursor and sub:
+        before_cursor = substitute(before_cursor, **kw)
+    if diff:
+        ahead = t.GRAY(post) if post else ""
+        if ahead and sub:
+            ahead = substitute(ahead, **kw)
+        lines = _frame_lines(before_cursor + ahead)
+        target = (before_cursor.count("\n"), visible_width(before_cursor.rpartition("\n")[2]))
+        _diff_frame(frame, old_frame, lines, target)
+        state["frame"] = (lines, target)
+        txt = before_cursor + (cursor.write_ahead(ahead) if ahead else "")
+        state["old"] = txt
+        return txt
+
+    if completion and sub:
+        completion = substitute(completion, **kw)
+    frame.write(before_cursor, completion)
     txt = before_cursor + completion
     state["old"] = txt
     return txt
 
+
+
+def _state_for(state, file):
+    return stream_state(file) if state is global_state else state
+
+
+def cprint(*pre: str,
+          completion: str="",
+          overwrite: bool = True,
+          overwrite_line_count: int | None = None,
+          file=sys.stdout,
+           end="", # kwargs to pass to print
+          print=print, # by default, use the print builtin, but allow overriding
+          state: dict | None = global_state, # this is INTENTIONALLY mutable
+          sub: bool = False,
+          diff: bool = False,
+           **kw,
+          ):
+    """
+    Print `pre` with a gray `completion` after the cursor, replacing what the previous call printed.
+
+    By default the state is shared per stream (see `stream_state`) and updates to it are locked,
+    so threads printing to the same stream don't corrupt each other's overwrites.
+
+    With `diff=True`, the previous frame is kept in `state` and only the lines (and the part of each line)
+    that changed are rewritten, instead of clearing and reprinting everything.
+    It expects plain (styled) text without cursor movements, and lines that fit in the terminal width.
+    """
+    state = _state_for(state, file)
+    # in auto mode, colors depend on the stream printed to
+    with getattr(state, "lock", None) or contextlib.nullcontext(), color_mode(ALWAYS if color_enabled(file) else NEVER):
+        # the whole update is sent at once at the end
+        frame = FrameWriter(file)
+        txt = _cprint(frame, pre, completion, overwrite, overwrite_line_count, state, sub, diff, **kw)
+        if getattr(state, "pending", 0):
+            # acprint frames are still queued for this stream, so keep the order
+            _frame_queue.put(state, frame, print)
+        else:
+            frame.send(print)
+    return txt
+
+
+async def acprint(*pre: str,
+                  file=sys.stdout,
+                  end="",
+                  print=print,
+                  state: dict | None = global_state,
+                  wait: bool = False,
+                  **kw,
+                  ) -> str:
+    """
+    `cprint` for asyncio code: the frame is composed right away, but written by a background thread,
+    so a slow terminal or pipe never blocks the event loop. Frames are written in call order.
+    With `wait=True`, returns only once this frame is written.
+    """
+    state = _state_for(state, file)
+    with getattr(state, "lock", None) or contextlib.nullcontext(), color_mode(ALWAYS if color_enabled(file) else NEVER):
+        frame = FrameWriter(file)
+        txt = _cprint(frame, pre, state=state, **kw)
+        future = _frame_queue.put(state, frame, print)
+    if wait:
+        import asyncio
+        await asyncio.wrap_future(future)
+    return txt
+
 if __name__ == "__main__":
     import time
     d = lambda: time.sleep(1)